@@ -0,0 +1,561 @@
+# Lightmap shell packer (pure Python/NumPy, no Maya dependency)
+# Packs UV shell bounding boxes into a square lightmap tile with a skyline
+# bottom-left packer, optional 90 degree rotation and pixel-exact padding,
+# budgets per-object lightmap sizes packed into shared atlas pages, and
+# validates laid out UVs by rasterizing them into a texel ID buffer.
+import numpy as np
+
+
+def sliding_window_max(values, width):
+    """
+    Max of every window of `width` consecutive values along the last axis,
+    in O(values.size). Uses block prefix/suffix maxima (van Herk / Gil-Werman).
+    """
+    n = values.shape[-1]
+    padded = np.zeros(values.shape[:-1] + (n + (-n) % width,), dtype=values.dtype)
+    padded[..., :n] = values
+    return reduce_padded_windows(padded, width, n - width + 1, np.maximum)
+
+
+def reduce_padded_windows(padded, width, count, reduce):
+    """
+    reduce (np.maximum or np.minimum) over the first `count` windows of
+    `width` values along the last axis of `padded`, whose length must be a
+    multiple of width. padded is overwritten with the block prefixes; the
+    result is a view into the single suffix buffer, so a call allocates one
+    array of padded's size.
+    """
+    blocks = padded.reshape(padded.shape[:-1] + (-1, width))
+    flat = padded.shape
+    suffix = np.empty_like(blocks)
+    reduce.accumulate(blocks[..., ::-1], axis=-1, out=suffix[..., ::-1])
+    reduce.accumulate(blocks, axis=-1, out=blocks)
+    suffix = suffix.reshape(flat)
+    result = suffix[..., :count]
+    reduce(result, padded[..., width - 1 : width - 1 + count], out=result)
+    return result
+
+
+def find_skyline_position(heights, width, height, bin_height):
+    """
+    Lowest (then leftmost) position for a width x height rect on the skyline.
+    Returns (x, y) or None if the rect does not fit.
+    """
+    if width > len(heights):
+        return None
+    tops = sliding_window_max(heights, width)
+    x = int(np.argmin(tops))
+    y = int(tops[x])
+    if y + height > bin_height:
+        return None
+    return x, y
+
+
+def pack_rects(sizes, bin_width, bin_height, allow_rotation=True, heights=None):
+    """
+    Pack integer (width, height) rects into a bin with a skyline packer.
+    Rects are placed tallest first at the lowest available position.
+    `heights` is an optional initial skyline (one height per column), used
+    to pack around space that is already occupied.
+    Returns (positions, rotated) with positions as an (N, 2) int array, or
+    None if any rect does not fit.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+    if heights is None:
+        heights = np.zeros(bin_width, dtype=np.int64)
+    else:
+        heights = np.array(heights, dtype=np.int64)
+    positions = np.zeros((len(sizes), 2), dtype=np.int64)
+    rotated = np.zeros(len(sizes), dtype=bool)
+
+    order = np.argsort(-sizes.max(axis=1) if allow_rotation else -sizes[:, 1])
+    for i in order:
+        width, height = sizes[i]
+        best = find_skyline_position(heights, width, height, bin_height)
+        if allow_rotation and width != height:
+            turned = find_skyline_position(heights, height, width, bin_height)
+            if turned is not None and (
+                best is None or turned[1] + width < best[1] + height
+            ):
+                best = turned
+                rotated[i] = True
+                width, height = height, width
+        if best is None:
+            return None
+        x, y = best
+        heights[x : x + width] = y + height
+        positions[i] = best
+    return positions, rotated
+
+
+def compute_shell_bounds(u, v, shell_ids, num_shells):
+    """
+    Bounding box (umin, vmin, umax, vmax) of every UV shell, vectorized.
+    """
+    bounds = np.empty((num_shells, 4), dtype=np.float64)
+    bounds[:, :2] = np.inf
+    bounds[:, 2:] = -np.inf
+    np.minimum.at(bounds[:, 0], shell_ids, u)
+    np.minimum.at(bounds[:, 1], shell_ids, v)
+    np.maximum.at(bounds[:, 2], shell_ids, u)
+    np.maximum.at(bounds[:, 3], shell_ids, v)
+    return bounds
+
+
+def padding_to_pixels(padding, resolution):
+    """
+    Convert a UI padding value (in 1/1024 UV units, like u3dLayout -spc/-mar)
+    into whole pixels at the given resolution.
+    """
+    return int(np.ceil(padding / 1024.0 * resolution - 1e-9))
+
+
+def pack_shells(
+    shell_bounds,
+    resolution,
+    shell_padding=3.0,
+    tile_padding=3.0,
+    allow_rotation=True,
+    iterations=24,
+):
+    """
+    Pack UV shells into one 0-1 tile at the largest uniform scale that fits.
+    Every shell gets a whole-pixel rect at `resolution`, at least
+    `shell_padding` pixels away from other shells and `tile_padding` pixels
+    away from the tile border (paddings use the u3dLayout units).
+    Returns a dict with scale, positions (pixels), rotated, resolution and
+    fill_ratio, or None if the shells cannot fit even at the minimum size.
+    """
+    resolution = int(resolution)
+    shell_bounds = np.asarray(shell_bounds, dtype=np.float64).reshape(-1, 4)
+    extents = np.maximum(shell_bounds[:, 2:] - shell_bounds[:, :2], 0.0)
+    shell_px = padding_to_pixels(shell_padding, resolution)
+    tile_px = padding_to_pixels(tile_padding, resolution)
+    inner = resolution - 2 * tile_px
+    if inner <= 0 or len(extents) == 0:
+        return None
+
+    # Each rect carries its trailing shell padding, so the bin grows by one
+    # padding to keep the last content pixel inside the inner tile area.
+    bin_size = inner + shell_px
+
+    def try_scale(scale):
+        content = np.maximum(np.ceil(extents * scale * resolution - 1e-9), 1)
+        result = pack_rects(
+            content.astype(np.int64) + shell_px, bin_size, bin_size, allow_rotation
+        )
+        return result
+
+    area = float(np.sum(extents[:, 0] * extents[:, 1]))
+    longest = float(extents.max())
+    high = float(inner) / resolution / max(longest, 1e-12)
+    if area > 0:
+        high = min(high, np.sqrt(float(inner * inner) / area) / resolution)
+    low = 0.0
+    best = try_scale(low)
+    if best is None:
+        return None
+    best_scale = low
+    for _ in range(iterations):
+        mid = (low + high) / 2.0
+        result = try_scale(mid)
+        if result is not None:
+            low, best, best_scale = mid, result, mid
+        else:
+            high = mid
+        if high - low <= high * 1e-3:
+            break
+
+    positions, rotated = best
+    scaled_area = area * (best_scale * resolution) ** 2
+    return {
+        "scale": best_scale,
+        "positions": positions + tile_px,
+        "rotated": rotated,
+        "resolution": resolution,
+        "fill_ratio": scaled_area / float(resolution * resolution),
+    }
+
+
+def transform_uvs(u, v, shell_ids, shell_bounds, packing):
+    """
+    Move every UV into its packed shell rect. Vectorized over all UVs.
+    Rotated shells are turned 90 degrees counter-clockwise.
+    Returns (u, v) as new arrays in 0-1 tile space.
+    """
+    shell_bounds = np.asarray(shell_bounds, dtype=np.float64).reshape(-1, 4)
+    scale = packing["scale"]
+    resolution = float(packing["resolution"])
+    local_u = (u - shell_bounds[shell_ids, 0]) * scale
+    local_v = (v - shell_bounds[shell_ids, 1]) * scale
+    height = (shell_bounds[shell_ids, 3] - shell_bounds[shell_ids, 1]) * scale
+
+    turned = packing["rotated"][shell_ids]
+    new_u = np.where(turned, height - local_v, local_u)
+    new_v = np.where(turned, local_u, local_v)
+
+    offsets = packing["positions"][shell_ids] / resolution
+    return new_u + offsets[:, 0], new_v + offsets[:, 1]
+
+
+def triangle_areas(points, triangles):
+    """
+    Area of every triangle, vectorized.
+    points is (N, 3), triangles is a flat or (M, 3) array of point indices.
+    """
+    corners = points[np.asarray(triangles, dtype=np.int64).reshape(-1, 3)]
+    cross = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    return 0.5 * np.sqrt(np.einsum("ij,ij->i", cross, cross))
+
+
+def compute_lightmap_budgets(areas, budget_texels, min_size=32, max_size=2048):
+    """
+    Give every object a square power-of-two lightmap size proportional to the
+    square root of its surface area, so all objects get the same texel
+    density, while the total texel count stays under budget_texels.
+    Rounding down to a power of two can leave most of the budget unused, so
+    the objects that lost the most density to rounding are then doubled,
+    largest loss first, as long as the total stays under budget.
+    The total only exceeds the budget when every object is at min_size.
+    Returns an int array of sizes.
+    """
+    areas = np.asarray(areas, dtype=np.float64)
+    total_area = float(areas.sum())
+    if total_area <= 0:
+        return np.full(len(areas), min_size, dtype=np.int64)
+
+    def sides_for(density):
+        return np.clip(density * np.sqrt(areas), min_size, max_size)
+
+    def sizes_for(density):
+        # Round down to a power of two so the budget is never exceeded by rounding
+        return (2 ** np.floor(np.log2(sides_for(density)))).astype(np.int64)
+
+    density = np.sqrt(budget_texels / total_area)
+    sizes = sizes_for(density)
+    # Clamping to min_size can push the total over budget; shrink the density
+    # until it fits or every object is at the minimum size.
+    while np.sum(sizes * sizes) > budget_texels and sizes.max() > min_size:
+        density *= 0.9
+        sizes = sizes_for(density)
+
+    # Promote the largest rounding losses (ideal side / rounded size) while
+    # the doubled size still fits in the budget and under max_size
+    total = int(np.sum(sizes * sizes))
+    loss = sides_for(density) / sizes
+    for i in np.argsort(-loss, kind="stable"):
+        if loss[i] <= 1.0:
+            break
+        size = int(sizes[i])
+        if size * 2 <= max_size and total + 3 * size * size <= budget_texels:
+            sizes[i] = size * 2
+            total += 3 * size * size
+    return sizes
+
+
+def pack_atlases(sizes, atlas_size):
+    """
+    Pack square lightmaps of the given sizes into as few shared atlas pages
+    of atlas_size as possible. Sizes larger than an atlas get their own page.
+    Returns (pages, positions): the page index and pixel offset per size.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    pages = np.full(len(sizes), -1, dtype=np.int64)
+    positions = np.zeros((len(sizes), 2), dtype=np.int64)
+    page_count = 0
+
+    for i in np.flatnonzero(sizes >= atlas_size):
+        pages[i] = page_count
+        page_count += 1
+
+    remaining = [i for i in np.argsort(-sizes, kind="stable") if pages[i] < 0]
+    while remaining:
+        heights = np.zeros(atlas_size, dtype=np.int64)
+        leftover = []
+        for i in remaining:
+            size = sizes[i]
+            position = find_skyline_position(heights, size, size, atlas_size)
+            if position is None:
+                leftover.append(i)
+                continue
+            x, y = position
+            heights[x : x + size] = y + size
+            pages[i] = page_count
+            positions[i] = position
+        page_count += 1
+        remaining = leftover
+    return pages, positions
+
+
+def fan_triangulate(counts, ids):
+    """
+    Fan-triangulate polygons given as per-face vertex counts and a flat list
+    of per-face-vertex ids. Faces with fewer than 3 ids are skipped.
+    Returns (triangles, faces): an (M, 3) id array and the face of each row.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    ids = np.asarray(ids, dtype=np.int64)
+    face_start = np.cumsum(counts) - counts
+    tri_counts = np.maximum(counts - 2, 0)
+    faces = np.repeat(np.arange(len(counts)), tri_counts)
+    first_tri = np.cumsum(tri_counts) - tri_counts
+    corner = np.arange(len(faces)) - first_tri[faces]
+    start = face_start[faces]
+    triangles = np.stack(
+        [ids[start], ids[start + corner + 1], ids[start + corner + 2]], axis=1
+    )
+    return triangles, faces
+
+
+def rasterize_triangles(uv_triangles, labels, resolution, chunk_texels=1 << 20):
+    """
+    Rasterize UV triangles at texel centers into a resolution x resolution
+    buffer, vectorized over (triangle, texel) candidate pairs in chunks.
+    uv_triangles is (M, 3, 2) in 0-1 tile space, labels is (M,) int >= 0.
+    Returns (label_buffer, overlap): label_buffer holds a covering label
+    per texel (-1 when empty), overlap is True where different labels meet.
+    """
+    resolution = int(resolution)
+    texels = np.asarray(uv_triangles, dtype=np.float64) * resolution
+    labels = np.asarray(labels, dtype=np.int32)
+
+    # Texel-center bounding box of every triangle, clipped to the tile
+    low = np.clip(np.ceil(texels.min(axis=1) - 0.5), 0, resolution)
+    high = np.clip(np.floor(texels.max(axis=1) - 0.5) + 1, 0, resolution)
+    extent = np.maximum(high - low, 0).astype(np.int64)
+    low = low.astype(np.int64)
+    candidates = extent[:, 0] * extent[:, 1]
+
+    label_buffer = np.full(resolution * resolution, -1, dtype=np.int32)
+    overlap = np.zeros(resolution * resolution, dtype=bool)
+    first = 0
+    cumulative = np.cumsum(candidates)
+    while first < len(candidates):
+        base = cumulative[first - 1] if first else 0
+        last = int(np.searchsorted(cumulative, base + chunk_texels, side="right"))
+        last = max(last, first + 1)
+        tris = np.arange(first, last)
+        first = last
+
+        per_tri = candidates[tris]
+        tri = np.repeat(tris, per_tri)
+        if len(tri) == 0:
+            continue
+        offset = np.arange(len(tri)) - np.repeat(np.cumsum(per_tri) - per_tri, per_tri)
+        px = low[tri, 0] + offset % extent[tri, 0]
+        py = low[tri, 1] + offset // extent[tri, 0]
+
+        # Edge functions at the texel centers, accepting either winding
+        cx = px + 0.5
+        cy = py + 0.5
+        a, b, c = texels[tri, 0], texels[tri, 1], texels[tri, 2]
+        e0 = (b[:, 0] - a[:, 0]) * (cy - a[:, 1]) - (b[:, 1] - a[:, 1]) * (cx - a[:, 0])
+        e1 = (c[:, 0] - b[:, 0]) * (cy - b[:, 1]) - (c[:, 1] - b[:, 1]) * (cx - b[:, 0])
+        e2 = (a[:, 0] - c[:, 0]) * (cy - c[:, 1]) - (a[:, 1] - c[:, 1]) * (cx - c[:, 0])
+        inside = ((e0 >= 0) & (e1 >= 0) & (e2 >= 0)) | (
+            (e0 <= 0) & (e1 <= 0) & (e2 <= 0)
+        )
+        texel = py[inside] * resolution + px[inside]
+        texel_labels = labels[tri[inside]]
+
+        # Written chunk by chunk: a texel overlaps when an earlier chunk left
+        # another label there, or when, after the last write wins, a sample
+        # of this chunk differs from the stored label.
+        previous = label_buffer[texel]
+        overlap[texel[(previous >= 0) & (previous != texel_labels)]] = True
+        label_buffer[texel] = texel_labels
+        overlap[texel[label_buffer[texel] != texel_labels]] = True
+    shape = (resolution, resolution)
+    return label_buffer.reshape(shape), overlap.reshape(shape)
+
+
+def chebyshev_max_filter(image, radius, reduce=np.maximum):
+    """
+    Max over the (2 * radius + 1)^2 square around every pixel, separable and
+    independent of the radius. Pixels outside the image are ignored.
+    With reduce=np.minimum, the min instead. Each axis pass allocates one
+    padded buffer and one result buffer.
+    """
+    if radius <= 0:
+        return image
+    info = np.iinfo(image.dtype)
+    fill = info.min if reduce is np.maximum else info.max
+    width = 2 * radius + 1
+    for axis in (0, 1):
+        moved = np.moveaxis(image, axis, -1)
+        n = moved.shape[-1]
+        length = n + 2 * radius
+        padded = np.full(
+            moved.shape[:-1] + (length + (-length) % width,), fill, dtype=image.dtype
+        )
+        padded[..., radius : radius + n] = moved
+        del moved, image
+        image = np.moveaxis(reduce_padded_windows(padded, width, n, reduce), -1, axis)
+        del padded
+    return image
+
+
+def validate_layout(
+    u, v, uv_triangles, shell_ids, resolution, shell_padding=3.0, tile_padding=3.0
+):
+    """
+    Check a laid out lightmap UV set at its target resolution.
+    u, v are the UVs, uv_triangles an (M, 3) array of UV ids and shell_ids
+    the shell of every UV. Paddings use the u3dLayout units.
+    Returns a dict of texel counts: overlap (texels covered by more than one
+    shell), padding (texels closer than the shell padding to another shell),
+    margin (texels inside the tile padding band), plus out_of_tile (UVs
+    outside 0-1) and coverage (covered fraction of the tile).
+    """
+    resolution = int(resolution)
+    u = np.asarray(u, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    uv_triangles = np.asarray(uv_triangles, dtype=np.int64).reshape(-1, 3)
+    corners = np.stack([u[uv_triangles], v[uv_triangles]], axis=-1)
+    labels = np.asarray(shell_ids, dtype=np.int32)[uv_triangles[:, 0]]
+    label_buffer, overlap = rasterize_triangles(corners, labels, resolution)
+
+    covered = label_buffer >= 0
+    shell_px = padding_to_pixels(shell_padding, resolution)
+    tile_px = padding_to_pixels(tile_padding, resolution)
+
+    # A texel violates the padding when another shell lies within shell_px
+    # texels of it, i.e. when the neighborhood max or min label differs.
+    # Empty texels are -1 for the max and raised to the dtype max in place
+    # for the min, so neither filter sees them as another shell.
+    too_close = chebyshev_max_filter(label_buffer, shell_px) > label_buffer
+    label_buffer[~covered] = np.iinfo(label_buffer.dtype).max
+    too_close |= chebyshev_max_filter(label_buffer, shell_px, np.minimum) < label_buffer
+    too_close &= covered
+
+    margin = np.zeros_like(covered)
+    if tile_px > 0:
+        margin[:tile_px, :] = margin[-tile_px:, :] = True
+        margin[:, :tile_px] = margin[:, -tile_px:] = True
+
+    return {
+        "overlap": int(np.count_nonzero(overlap)),
+        "padding": int(np.count_nonzero(too_close & ~overlap)),
+        "margin": int(np.count_nonzero(covered & margin)),
+        "out_of_tile": int(np.count_nonzero((u < 0) | (u > 1) | (v < 0) | (v > 1))),
+        "coverage": float(np.count_nonzero(covered)) / (resolution * resolution),
+    }
+
+
+def count_zero_area_faces(points, triangle_counts, triangles, epsilon=1e-12):
+    """
+    Number of polygons whose triangulated area is at most epsilon.
+    triangle_counts holds the number of triangles of every polygon and
+    triangles the flat point ids of all triangles, as MFnMesh.getTriangles.
+    """
+    triangle_counts = np.asarray(triangle_counts, dtype=np.int64)
+    faces = np.repeat(np.arange(len(triangle_counts)), triangle_counts)
+    areas = np.bincount(
+        faces,
+        weights=triangle_areas(points, triangles),
+        minlength=len(triangle_counts),
+    )
+    return int(np.count_nonzero(areas <= epsilon))
+
+
+def count_non_manifold_uv_edges(counts, ids):
+    """
+    Number of UV edges shared by more than two faces.
+    counts and ids are the per-face UV counts and ids of a UV set, as
+    MFnMesh.getAssignedUVs.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(ids) == 0:
+        return 0
+    # Next id around each face: shift by one, wrapping at the face start
+    face_start = np.repeat(np.cumsum(counts) - counts, counts)
+    corner = np.arange(len(ids)) - face_start
+    following = face_start + (corner + 1) % np.repeat(counts, counts)
+    low = np.minimum(ids, ids[following])
+    high = np.maximum(ids, ids[following])
+    keys = np.sort(low * (int(ids.max()) + 1) + high)
+    run_starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    run_lengths = np.diff(np.concatenate((run_starts, [len(keys)])))
+    return int(np.count_nonzero(run_lengths > 2))
+
+
+def find_free_square(occupied, size):
+    """
+    Lowest, then leftmost position of a free size x size square in a boolean
+    occupancy grid indexed [y, x], using a summed-area table.
+    Returns (x, y) or None.
+    """
+    height, width = occupied.shape
+    if size > width or size > height:
+        return None
+    table = np.zeros((height + 1, width + 1), dtype=np.int64)
+    table[1:, 1:] = occupied.cumsum(axis=0).cumsum(axis=1)
+    window = (
+        table[size:, size:]
+        - table[:-size, size:]
+        - table[size:, :-size]
+        + table[:-size, :-size]
+    )
+    free = np.flatnonzero(window.ravel() == 0)
+    if free.size == 0:
+        return None
+    y, x = divmod(int(free[0]), window.shape[1])
+    return x, y
+
+
+def place_in_free_space(occupied_rects, sizes, atlas_size, add_pages=False):
+    """
+    Place squares of the given sizes into the free space of existing atlas
+    pages, largest first, without moving what is already there.
+    occupied_rects lists the squares already placed as (page, x, y, size);
+    sizes at or above atlas_size fill their page. With add_pages, squares
+    that fit nowhere open a new empty page; without it, None is returned
+    if any square does not fit.
+    Occupancy is tracked on a grid whose cell is the greatest common divisor
+    of every size and position, which is exact since all squares are
+    aligned to it, and small for power-of-two lightmap sizes.
+    Returns (pages, positions, page count), or None.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    if len(sizes) and sizes.max() > atlas_size:
+        return None
+    rects = [
+        (int(page), int(x), int(y), min(int(size), atlas_size))
+        for page, x, y, size in occupied_rects
+    ]
+    aligned = [atlas_size] + sizes.tolist()
+    aligned += [value for _, x, y, size in rects for value in (x, y, size)]
+    cell = int(np.gcd.reduce(aligned))
+    cells = atlas_size // cell
+
+    page_count = max([rect[0] for rect in rects] + [-1]) + 1
+    occupied_pages = [np.zeros((cells, cells), dtype=bool) for _ in range(page_count)]
+    for page, x, y, size in rects:
+        x, y, size = x // cell, y // cell, size // cell
+        occupied_pages[page][y : y + size, x : x + size] = True
+    free = [occupied.size - np.count_nonzero(occupied) for occupied in occupied_pages]
+
+    pages = np.full(len(sizes), -1, dtype=np.int64)
+    positions = np.zeros((len(sizes), 2), dtype=np.int64)
+    for i in np.argsort(-sizes, kind="stable"):
+        size = int(sizes[i]) // cell
+        for page, occupied in enumerate(occupied_pages):
+            if free[page] < size * size:
+                continue
+            position = find_free_square(occupied, size)
+            if position is not None:
+                break
+        else:
+            if not add_pages:
+                return None
+            occupied_pages.append(np.zeros((cells, cells), dtype=bool))
+            free.append(cells * cells)
+            page = len(occupied_pages) - 1
+            position = (0, 0)
+        x, y = position
+        occupied_pages[page][y : y + size, x : x + size] = True
+        free[page] -= size * size
+        pages[i] = page
+        positions[i] = (x * cell, y * cell)
+    return pages, positions, len(occupied_pages)
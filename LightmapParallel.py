@@ -0,0 +1,232 @@
+# Parallel lightmap layout with headless mayapy worker processes
+# The scheduling, retry and merge logic has no Maya dependency, so it can be
+# exercised with FakeLayoutWorker. Run as a script under mayapy, this file
+# is also the worker entry point:
+#   mayapy LightmapParallel.py <manifest.json> <result.npz>
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+UV_KEYS = ("u", "v", "counts", "ids")
+
+
+def chunk_items(items, chunk_count):
+    """
+    Split items into at most chunk_count chunks of near-equal size,
+    keeping their order.
+    """
+    chunk_count = max(1, min(chunk_count, len(items)))
+    size, extra = divmod(len(items), chunk_count)
+    chunks = []
+    start = 0
+    for i in range(chunk_count):
+        stop = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:stop])
+        start = stop
+    return [chunk for chunk in chunks if chunk]
+
+
+def run_parallel_chunks(chunks, runner, workers=4, retries=2):
+    """
+    Run runner(chunk) for every chunk on a pool of worker threads. Each
+    thread drives one external worker process, so Maya itself stays on the
+    main thread. A chunk that raises is retried up to `retries` times.
+    Returns (results, errors): results is aligned with chunks (None for
+    chunks that failed every attempt), errors maps chunk index to the
+    last error message.
+    """
+    results = [None] * len(chunks)
+    errors = {}
+
+    def attempt(index):
+        for attempt_number in range(retries + 1):
+            try:
+                return runner(chunks[index])
+            except Exception as e:
+                errors[index] = "attempt {}: {}".format(attempt_number + 1, e)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(attempt, i): i for i in range(len(chunks))}
+        for future, index in futures.items():
+            results[index] = future.result()
+            if results[index] is not None:
+                errors.pop(index, None)
+    return results, errors
+
+
+def merge_chunk_results(chunks, results):
+    """
+    Flatten chunk results back into the original item order.
+    Returns (merged, failed): merged is a list of (uuid, uv_data) in chunk
+    order, failed lists the uuids without a result.
+    """
+    merged = []
+    failed = []
+    for chunk, result in zip(chunks, results):
+        for item in chunk["shapes"]:
+            uv_data = (result or {}).get(item["uuid"])
+            if uv_data is None:
+                failed.append(item["uuid"])
+            else:
+                merged.append((item["uuid"], uv_data))
+    return merged, failed
+
+
+def save_uv_results(path, uv_by_uuid):
+    arrays = {}
+    for uuid, uv_data in uv_by_uuid.items():
+        for key in UV_KEYS:
+            arrays["{}/{}".format(uuid, key)] = uv_data[key]
+    np.savez(path, **arrays)
+
+
+def load_uv_results(path):
+    uv_by_uuid = {}
+    with np.load(path) as data:
+        for name in data.files:
+            uuid, _, key = name.rpartition("/")
+            uv_by_uuid.setdefault(uuid, {})[key] = data[name]
+    return uv_by_uuid
+
+
+def find_mayapy():
+    """
+    Path of the mayapy interpreter of the running Maya installation.
+    """
+    executable = "mayapy.exe" if os.name == "nt" else "mayapy"
+    return os.path.join(os.environ.get("MAYA_LOCATION", ""), "bin", executable)
+
+
+class MayapyWorkerRunner:
+    """
+    Lays out one exported chunk in a headless mayapy process.
+    The chunk dict carries the exported scene path, the layout options and
+    the shapes as {"uuid": ..., "settings": [shell, tile, resolution]}.
+    """
+
+    def __init__(self, mayapy=None, timeout=3600):
+        self.mayapy = mayapy or find_mayapy()
+        self.timeout = timeout
+
+    def __call__(self, chunk):
+        base = os.path.splitext(chunk["scene"])[0]
+        manifest_path = base + ".json"
+        result_path = base + "_result.npz"
+        with open(manifest_path, "w") as f:
+            json.dump(chunk, f)
+        if os.path.exists(result_path):
+            os.remove(result_path)
+
+        process = subprocess.run(
+            [self.mayapy, os.path.abspath(__file__), manifest_path, result_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=self.timeout,
+        )
+        if process.returncode != 0 or not os.path.exists(result_path):
+            output = process.stdout.decode("utf-8", "replace").strip()
+            raise RuntimeError(
+                "mayapy exited with {}: {}".format(
+                    process.returncode, output.splitlines()[-1] if output else ""
+                )
+            )
+        return load_uv_results(result_path)
+
+
+class FakeLayoutWorker:
+    """
+    Stand-in for MayapyWorkerRunner that needs no Maya license.
+    It returns deterministic UVs per shape after a random delay (to shuffle
+    completion order) and fails the first fail_attempts[index] attempts of
+    a chunk, so scheduling, retries and merge ordering can be checked.
+    """
+
+    def __init__(self, fail_attempts=None, max_delay=0.01, seed=0):
+        self.fail_attempts = dict(fail_attempts or {})
+        self.max_delay = max_delay
+        self.random = random.Random(seed)
+        self.calls = []
+
+    def __call__(self, chunk):
+        self.calls.append(chunk["index"])
+        time.sleep(self.random.random() * self.max_delay)
+        if self.fail_attempts.get(chunk["index"], 0) > 0:
+            self.fail_attempts[chunk["index"]] -= 1
+            raise RuntimeError("fake worker failure")
+        return {
+            item["uuid"]: self.fake_uv_data(position, item)
+            for position, item in enumerate(chunk["shapes"])
+        }
+
+    @staticmethod
+    def fake_uv_data(position, item):
+        resolution = float(item["settings"][2])
+        return {
+            "u": np.full(4, position / resolution, dtype=np.float32),
+            "v": np.full(4, position / resolution, dtype=np.float32),
+            "counts": np.array([4], dtype=np.int32),
+            "ids": np.arange(4, dtype=np.int32),
+        }
+
+
+def worker_main(manifest_path, result_path):
+    """
+    mayapy entry point: open the exported chunk, lay out its shapes with the
+    regular tool functions and save the lightmap UVs keyed by node UUID.
+    """
+    import maya.standalone
+
+    maya.standalone.initialize(name="python")
+    try:
+        from maya import cmds
+
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import UVLayoutForLightmaps as layout
+
+        with open(manifest_path) as f:
+            chunk = json.load(f)
+        # mayapy does not autoload plugins; u3dLayout comes from Unfold3D
+        if chunk["engine"] == "u3dLayout":
+            try:
+                cmds.loadPlugin("Unfold3D", quiet=True)
+            except RuntimeError as e:
+                raise RuntimeError(
+                    "Could not load the Unfold3D plugin for u3dLayout: {}".format(e)
+                )
+        cmds.file(chunk["scene"], open=True, force=True)
+
+        groups = {}
+        for item in chunk["shapes"]:
+            shape = (cmds.ls(item["uuid"], long=True) or [None])[0]
+            if shape:
+                groups.setdefault(tuple(item["settings"]), []).append(
+                    (item["uuid"], shape)
+                )
+
+        uv_by_uuid = {}
+        for settings, members in groups.items():
+            shapes = [shape for _, shape in members]
+            failed = layout.layout_shape_group(
+                shapes,
+                chunk["uvset"],
+                *settings,
+                engine=chunk["engine"],
+                allow_rotation=chunk["allow_rotation"],
+            )
+            for uuid, shape in members:
+                if shape not in failed:
+                    uv_by_uuid[uuid] = layout.read_uv_set(shape, chunk["uvset"])
+        save_uv_results(result_path, uv_by_uuid)
+    finally:
+        maya.standalone.uninitialize()
+
+
+if __name__ == "__main__":
+    worker_main(sys.argv[1], sys.argv[2])
@@ -1,17 +1,60 @@
 # Lightmap UV Layout Tool for Maya (updated: use -spc and -mar for u3dLayout)
 # Uses maya.cmds and maya.mel
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
 from maya import cmds, mel
 
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    om = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import LightmapPacker
+except ImportError:
+    LightmapPacker = None
+
+try:
+    import LightmapParallel
+except ImportError:
+    LightmapParallel = None
+
 WINDOW_NAME = "lightmapUVLayoutTool_win"
 
+# Number of shapes laid out by a single batched MEL evaluation
+BATCH_CHUNK_SIZE = 200
+
+# Packing engines: Maya's u3dLayout or the NumPy skyline packer
+ENGINE_U3D = "u3dLayout"
+ENGINE_NUMPY = "numpy"
+ENGINES = (ENGINE_U3D, ENGINE_NUMPY)
+
+# Layout cache defaults (stored under the Maya user app directory)
+CACHE_DIR_NAME = "lightmapLayoutCache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Validation rasterizes a full texel buffer per shape; larger lightmaps are
+# checked at this resolution to bound memory (about 0.3 GB peak at 4096)
+VALIDATION_MAX_RESOLUTION = 4096
+
 
-def ensure_uv_set_on_shape(shape, uvset_name):
+def ensure_uv_set_on_shape(shape, uvset_name, verbose=True):
     try:
         existing = cmds.polyUVSet(shape, query=True, allUVSets=True) or []
     except Exception:
         existing = []
     if uvset_name in existing:
-        print("Info: Found existing UV set '{}' for {}.".format(uvset_name, shape))
+        if verbose:
+            print("Info: Found existing UV set '{}' for {}.".format(uvset_name, shape))
         return True
     if "map1" not in existing:
         print(
@@ -36,11 +79,12 @@ def ensure_uv_set_on_shape(shape, uvset_name):
                 )
             )
             return False
-    print(
-        "Info: Created new UV set '{}' for {} (copied from 'map1').".format(
-            uvset_name, shape
+    if verbose:
+        print(
+            "Info: Created new UV set '{}' for {} (copied from 'map1').".format(
+                uvset_name, shape
+            )
         )
-    )
     return True
 
 
@@ -65,6 +109,19 @@ def set_current_uv_set(shape, uvset_name):
             return False
 
 
+def build_layout_command(shape, shell_padding, tile_padding, resolution):
+    """
+    Build the u3dLayout MEL command for one shape.
+    Use -spc for shell padding and -mar for margin/tile padding.
+    """
+    return 'u3dLayout -res {res} -scl 1 -spc {sp} -mar {tp} -box 0 1 0 1 "{obj}";'.format(
+        sp=float(shell_padding / 1024),
+        tp=float(tile_padding / 1024),
+        res=float(resolution),
+        obj=shape,
+    )
+
+
 def layout_uvs_for_shape(shape, uvset_name, shell_padding, tile_padding, resolution):
     """
     Run u3dLayout. Use -spc for shell padding and -mar for margin/tile padding.
@@ -78,18 +135,16 @@ def layout_uvs_for_shape(shape, uvset_name, shell_padding, tile_padding, resolut
         cmds.select(shape, replace=True)
 
         # Use -spc and -mar which are accepted in your environment (based on provided log)
-        mel_cmd = 'u3dLayout -res {res} -scl 1 -spc {sp} -mar {tp} -box 0 1 0 1 "{obj}";'.format(
-            sp=float(shell_padding / 1024),
-            tp=float(tile_padding / 1024),
-            res=float(resolution),
-            obj=shape,
-        )
-        mel.eval(mel_cmd)
+        mel.eval(build_layout_command(shape, shell_padding, tile_padding, resolution))
         return True
     except Exception as e:
         # fallback: try a minimal call without flags
         try:
             mel.eval('u3dLayout "{0}";'.format(shape))
+            print(
+                "Warning: u3dLayout with padding flags failed on {}; laid out "
+                "without padding/resolution. ({})".format(shape, e)
+            )
             return True
         except Exception:
             print(
@@ -100,6 +155,611 @@ def layout_uvs_for_shape(shape, uvset_name, shell_padding, tile_padding, resolut
             return False
 
 
+def layout_uvs_for_shapes(shapes, uvset_name, shell_padding, tile_padding, resolution):
+    """
+    Lay out many shapes that share the same settings.
+    The current UV set switch and u3dLayout call of every shape in a chunk are
+    sent as one MEL script, so there is one evaluation per chunk and no
+    selection change per shape. u3dLayout still packs each shape into its own
+    0-1 tile. If a chunk fails, its shapes are retried one by one.
+    Returns the list of shapes that failed.
+    """
+    failed = []
+    for i in range(0, len(shapes), BATCH_CHUNK_SIZE):
+        chunk = shapes[i : i + BATCH_CHUNK_SIZE]
+        script = "".join(
+            'polyUVSet -currentUVSet -uvSet "{0}" "{1}";{2}'.format(
+                uvset_name,
+                shape,
+                build_layout_command(shape, shell_padding, tile_padding, resolution),
+            )
+            for shape in chunk
+        )
+        try:
+            mel.eval(script)
+        except Exception:
+            for shape in chunk:
+                if not layout_uvs_for_shape(
+                    shape, uvset_name, shell_padding, tile_padding, resolution
+                ):
+                    failed.append(shape)
+    return failed
+
+
+def get_mesh_fn(shape):
+    selection = om.MSelectionList()
+    selection.add(shape)
+    return om.MFnMesh(selection.getDagPath(0))
+
+
+def read_uv_set(shape, uvset_name):
+    """
+    Read the UVs and their face-vertex assignment of a UV set in bulk.
+    Returns a dict of NumPy arrays: u, v, counts, ids.
+    """
+    fn = get_mesh_fn(shape)
+    us, vs = fn.getUVs(uvset_name)
+    counts, ids = fn.getAssignedUVs(uvset_name)
+    return {
+        "u": np.array(us, dtype=np.float32),
+        "v": np.array(vs, dtype=np.float32),
+        "counts": np.array(counts, dtype=np.int32),
+        "ids": np.array(ids, dtype=np.int32),
+    }
+
+
+def write_uv_set(shape, uvset_name, uv_data):
+    """
+    Write UVs read by read_uv_set back to a UV set with two API calls.
+    The UV set must already exist on the shape.
+    """
+    fn = get_mesh_fn(shape)
+    fn.setUVs(uv_data["u"].tolist(), uv_data["v"].tolist(), uvset_name)
+    fn.assignUVs(uv_data["counts"].tolist(), uv_data["ids"].tolist(), uvset_name)
+
+
+def compute_content_hash(shape):
+    """
+    Hash the face topology and the 'map1' UVs of a shape.
+    Shapes with the same hash produce the same lightmap layout.
+    """
+    fn = get_mesh_fn(shape)
+    digest = hashlib.sha1()
+    for array in fn.getVertices():
+        digest.update(np.array(array, dtype=np.int32).tobytes())
+    for array in fn.getUVs("map1"):
+        digest.update(np.array(array, dtype=np.float32).tobytes())
+    for array in fn.getAssignedUVs("map1"):
+        digest.update(np.array(array, dtype=np.int32).tobytes())
+    return digest.hexdigest()
+
+
+def compute_layout_key(content_hash, *settings):
+    """
+    Combine a content hash with the layout settings into a cache key.
+    """
+    return hashlib.sha1(
+        "{}|{}".format(content_hash, repr(settings)).encode("utf-8")
+    ).hexdigest()
+
+
+class LayoutCache:
+    """
+    On-disk cache of laid out lightmap UVs, one .npz file per layout key.
+    put only writes; call evict once after a run to drop entries
+    least-recently-used first until the cache fits in max_bytes.
+    A hit refreshes the file's modification time.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=CACHE_MAX_BYTES):
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                cmds.internalVar(userAppDir=True), CACHE_DIR_NAME
+            )
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                uv_data = {name: data[name] for name in data.files}
+        except Exception:
+            return None
+        os.utime(path, None)
+        return uv_data
+
+    def put(self, key, uv_data):
+        np.savez(self._path(key), **uv_data)
+
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+def layout_uvs_with_packer(
+    shape, uvset_name, shell_padding, tile_padding, resolution, allow_rotation=True
+):
+    """
+    Lay out the shells of a UV set with the NumPy packer instead of u3dLayout.
+    Shells keep their shape and are uniformly scaled, optionally rotated by
+    90 degrees, and placed with pixel-exact padding at the given resolution.
+    """
+    fn = get_mesh_fn(shape)
+    us, vs = fn.getUVs(uvset_name)
+    if not len(us):
+        print("Error: UV set '{}' on {} has no UVs.".format(uvset_name, shape))
+        return False
+    num_shells, shell_ids = fn.getUvShellsIds(uvset_name)
+
+    u = np.array(us, dtype=np.float64)
+    v = np.array(vs, dtype=np.float64)
+    shell_ids = np.array(shell_ids, dtype=np.int64)
+    bounds = LightmapPacker.compute_shell_bounds(u, v, shell_ids, num_shells)
+    packing = LightmapPacker.pack_shells(
+        bounds, resolution, shell_padding, tile_padding, allow_rotation
+    )
+    if packing is None:
+        print(
+            "Error: {} shells of {} do not fit at resolution {}.".format(
+                num_shells, shape, resolution
+            )
+        )
+        return False
+
+    new_u, new_v = LightmapPacker.transform_uvs(u, v, shell_ids, bounds, packing)
+    fn.setUVs(new_u.tolist(), new_v.tolist(), uvset_name)
+    return True
+
+
+def layout_shape_group(
+    shapes,
+    uvset_name,
+    shell_padding,
+    tile_padding,
+    resolution,
+    engine=ENGINE_U3D,
+    allow_rotation=True,
+):
+    """
+    Lay out shapes that share the same settings with the chosen engine.
+    Returns the list of shapes that failed.
+    """
+    if engine == ENGINE_U3D:
+        return layout_uvs_for_shapes(
+            shapes, uvset_name, shell_padding, tile_padding, resolution
+        )
+    return [
+        shape
+        for shape in shapes
+        if not layout_uvs_with_packer(
+            shape, uvset_name, shell_padding, tile_padding, resolution, allow_rotation
+        )
+    ]
+
+
+def validate_lightmap_uvs(shape, uvset_name, shell_padding, tile_padding, resolution):
+    """
+    Rasterize the lightmap UV triangles of a shape at the target resolution
+    and count overlapping, too-close, margin and out-of-tile texels.
+    """
+    fn = get_mesh_fn(shape)
+    us, vs = fn.getUVs(uvset_name)
+    counts, ids = fn.getAssignedUVs(uvset_name)
+    _, shell_ids = fn.getUvShellsIds(uvset_name)
+    triangles, _ = LightmapPacker.fan_triangulate(counts, ids)
+    return LightmapPacker.validate_layout(
+        np.array(us, dtype=np.float64),
+        np.array(vs, dtype=np.float64),
+        triangles,
+        np.array(shell_ids, dtype=np.int32),
+        resolution,
+        shell_padding,
+        tile_padding,
+    )
+
+
+def report_layout_validation(shapes, uvset_name, settings):
+    """
+    Validate the laid out shapes and print one warning per shape with issues.
+    settings maps each shape to (shell_padding, tile_padding, resolution).
+    Resolutions above VALIDATION_MAX_RESOLUTION are checked at that
+    resolution, so padding violations below one texel there can be missed.
+    Returns the number of shapes with issues.
+    """
+    issues = 0
+    capped = 0
+    for shape in shapes:
+        shell_padding, tile_padding, resolution = settings[shape]
+        if resolution > VALIDATION_MAX_RESOLUTION:
+            resolution = VALIDATION_MAX_RESOLUTION
+            capped += 1
+        report = validate_lightmap_uvs(
+            shape, uvset_name, shell_padding, tile_padding, resolution
+        )
+        problems = [
+            "{} {}".format(report[key], label)
+            for key, label in (
+                ("overlap", "overlapping texels"),
+                ("padding", "texels within shell padding"),
+                ("margin", "texels within tile padding"),
+                ("out_of_tile", "UVs outside 0-1"),
+            )
+            if report[key]
+        ]
+        if problems:
+            print("Warning: {}: {}.".format(shape, ", ".join(problems)))
+            issues += 1
+    if capped:
+        print(
+            "Warning: Validated {} shapes at {}px instead of their larger "
+            "resolution to limit memory use.".format(capped, VALIDATION_MAX_RESOLUTION)
+        )
+    return issues
+
+
+def preflight_shape(shape):
+    """
+    Cheap checks for shapes that u3dLayout would fail on or lay out badly:
+    empty shapes, missing or empty 'map1', zero-area faces and non-manifold
+    UV edges. All data is fetched in bulk and checked with NumPy.
+    Returns a list of reasons; an empty list means the shape is fine.
+    """
+    fn = get_mesh_fn(shape)
+    if fn.numPolygons == 0 or fn.numVertices == 0:
+        return ["empty shape"]
+
+    reasons = []
+    if "map1" not in fn.getUVSetNames() or fn.numUVs("map1") == 0:
+        reasons.append("missing 'map1' UVs")
+    else:
+        counts, ids = fn.getAssignedUVs("map1")
+        unmapped = int(np.count_nonzero(np.array(counts) == 0))
+        if unmapped:
+            reasons.append("{} faces without 'map1' UVs".format(unmapped))
+        non_manifold = LightmapPacker.count_non_manifold_uv_edges(counts, ids)
+        if non_manifold:
+            reasons.append("{} non-manifold UV edges".format(non_manifold))
+
+    points = np.array(fn.getPoints(om.MSpace.kObject), dtype=np.float64)[:, :3]
+    triangle_counts, triangles = fn.getTriangles()
+    zero_area = LightmapPacker.count_zero_area_faces(points, triangle_counts, triangles)
+    if zero_area:
+        reasons.append("{} zero-area faces".format(zero_area))
+    return reasons
+
+
+def compute_world_surface_area(shape):
+    """
+    World-space surface area of a mesh, from its triangulation fetched in bulk.
+    """
+    fn = get_mesh_fn(shape)
+    points = np.array(fn.getPoints(om.MSpace.kWorld), dtype=np.float64)[:, :3]
+    _, triangles = fn.getTriangles()
+    return float(LightmapPacker.triangle_areas(points, triangles).sum())
+
+
+def fit_uvs_into_atlas(shape, uvset_name, size, position, atlas_size):
+    """
+    Scale a shape's 0-1 lightmap UVs into its size x size rect of an atlas.
+    """
+    fn = get_mesh_fn(shape)
+    us, vs = fn.getUVs(uvset_name)
+    scale = float(size) / atlas_size
+    u = np.array(us, dtype=np.float64) * scale + float(position[0]) / atlas_size
+    v = np.array(vs, dtype=np.float64) * scale + float(position[1]) / atlas_size
+    fn.setUVs(u.tolist(), v.tolist(), uvset_name)
+
+
+def unfit_uvs_from_atlas(shape, uvset_name, size, position, atlas_size):
+    """
+    Inverse of fit_uvs_into_atlas: move atlas UVs back to the 0-1 tile.
+    """
+    fn = get_mesh_fn(shape)
+    us, vs = fn.getUVs(uvset_name)
+    scale = float(atlas_size) / size
+    u = (np.array(us, dtype=np.float64) - float(position[0]) / atlas_size) * scale
+    v = (np.array(vs, dtype=np.float64) - float(position[1]) / atlas_size) * scale
+    fn.setUVs(u.tolist(), v.tolist(), uvset_name)
+
+
+# Atlas placement attributes stored on laid out shapes
+ATLAS_ATTRS = (
+    ("lightmapAtlas", "long"),
+    ("lightmapResolution", "long"),
+    ("lightmapAtlasX", "long"),
+    ("lightmapAtlasY", "long"),
+)
+
+
+def store_atlas_assignment(shape, page, size, position, layout_key):
+    """
+    Record the atlas page, texel size and pixel position of a shape on the
+    shape node, so bake setups can group shapes per atlas. layout_key marks
+    the content and settings the placement was made for.
+    """
+    values = (page, size, position[0], position[1])
+    for (attr, attr_type), value in zip(ATLAS_ATTRS, values):
+        if not cmds.attributeQuery(attr, node=shape, exists=True):
+            cmds.addAttr(shape, longName=attr, attributeType=attr_type)
+        cmds.setAttr("{}.{}".format(shape, attr), int(value))
+    if not cmds.attributeQuery("lightmapLayoutKey", node=shape, exists=True):
+        cmds.addAttr(shape, longName="lightmapLayoutKey", dataType="string")
+    cmds.setAttr("{}.lightmapLayoutKey".format(shape), layout_key, type="string")
+
+
+def read_atlas_assignment(shape):
+    """
+    Return the stored atlas placement of a shape as a dict with page, size,
+    position and layout_key, or None if the shape has none.
+    """
+    for attr, _ in ATLAS_ATTRS + (("lightmapLayoutKey", None),):
+        if not cmds.attributeQuery(attr, node=shape, exists=True):
+            return None
+    values = [cmds.getAttr("{}.{}".format(shape, attr)) for attr, _ in ATLAS_ATTRS]
+    return {
+        "page": values[0],
+        "size": values[1],
+        "position": (values[2], values[3]),
+        "layout_key": cmds.getAttr("{}.lightmapLayoutKey".format(shape)) or "",
+    }
+
+
+def read_scene_atlas_assignments(exclude=()):
+    """
+    Return {shape: placement} for every mesh in the scene with a stored atlas
+    placement, skipping the shape nodes in exclude (compared by UUID, so any
+    DAG path of an instance is excluded).
+    """
+    excluded = set(cmds.ls(list(exclude), uuid=True) or []) if exclude else set()
+    placements = {}
+    seen = set()
+    for shape in cmds.ls(
+        "*.lightmapAtlas", objectsOnly=True, recursive=True, long=True
+    ) or []:
+        uuid = (cmds.ls(shape, uuid=True) or [shape])[0]
+        if uuid in excluded or uuid in seen:
+            continue
+        seen.add(uuid)
+        placement = read_atlas_assignment(shape)
+        if placement is not None and placement["page"] >= 0:
+            placements[shape] = placement
+    return placements
+
+
+def atlas_rects(placements):
+    """(page, x, y, size) squares of stored placements, for place_in_free_space."""
+    return [
+        (placement["page"],) + tuple(placement["position"]) + (placement["size"],)
+        for placement in placements
+    ]
+
+
+def assign_shared_atlases(
+    shapes, uvset_name, resolutions, atlas_size, layout_keys, page_offset=None
+):
+    """
+    Pack the per-shape lightmaps into shared atlas pages of atlas_size.
+    Shapes at or above atlas_size keep a page of their own.
+    The new pages are numbered after the pages already stored on other
+    meshes in the scene (or from page_offset), so they never overlap them.
+    Returns the number of atlas pages.
+    """
+    if not shapes:
+        return 0
+    if page_offset is None:
+        fixed = read_scene_atlas_assignments(shapes)
+        pages = [placement["page"] for placement in fixed.values()]
+        page_offset = max(pages + [-1]) + 1
+    sizes = [resolutions[shape] for shape in shapes]
+    pages, positions = LightmapPacker.pack_atlases(sizes, atlas_size)
+    pages += page_offset
+    for shape, size, page, position in zip(shapes, sizes, pages, positions):
+        if size < atlas_size:
+            fit_uvs_into_atlas(shape, uvset_name, size, position, atlas_size)
+        store_atlas_assignment(shape, page, size, position, layout_keys[shape])
+    return int(pages.max()) + 1
+
+
+def assign_shared_atlases_incremental(
+    shapes, kept, uvset_name, resolutions, atlas_size, layout_keys
+):
+    """
+    Fit changed or new shapes into the free space of the existing atlas
+    pages, leaving the kept shapes (shape -> stored placement) untouched.
+    Every other placed mesh in the scene counts as occupied space too.
+    When the shapes do not fit, the kept shapes are re-packed with them
+    around the rest of the scene, on new pages where needed.
+    Returns (atlas page count, whether the kept shapes were re-packed).
+    """
+    fixed = read_scene_atlas_assignments(list(shapes) + list(kept))
+    if not fixed and not kept:
+        # Nothing placed yet: a plain skyline pack is much faster
+        return assign_shared_atlases(
+            shapes, uvset_name, resolutions, atlas_size, layout_keys, page_offset=0
+        ), False
+    occupied = atlas_rects(fixed.values()) + atlas_rects(kept.values())
+    page_count = max([rect[0] for rect in occupied] + [-1]) + 1
+
+    # Shapes at or above the atlas size get a new page of their own
+    shared = []
+    own_pages = []
+    for shape in shapes:
+        if resolutions[shape] >= atlas_size:
+            store_atlas_assignment(
+                shape, page_count, resolutions[shape], (0, 0), layout_keys[shape]
+            )
+            own_pages.append((page_count, 0, 0, atlas_size))
+            page_count += 1
+        else:
+            shared.append(shape)
+
+    sizes = [resolutions[shape] for shape in shared]
+    placed = LightmapPacker.place_in_free_space(
+        occupied + own_pages, sizes, atlas_size
+    )
+    repacked = False
+    if placed is None:
+        # No room left: bring the kept shapes back to 0-1 and place them again
+        # with the new ones, around everything else in the scene
+        moved = [
+            shape for shape, placement in kept.items() if placement["size"] < atlas_size
+        ]
+        for shape in moved:
+            placement = kept[shape]
+            unfit_uvs_from_atlas(
+                shape, uvset_name, placement["size"], placement["position"], atlas_size
+            )
+        occupied = atlas_rects(fixed.values()) + own_pages
+        occupied += atlas_rects(
+            placement for placement in kept.values() if placement["size"] >= atlas_size
+        )
+        shared = moved + shared
+        sizes = [resolutions[shape] for shape in shared]
+        placed = LightmapPacker.place_in_free_space(
+            occupied, sizes, atlas_size, add_pages=True
+        )
+        repacked = bool(moved)
+
+    pages, positions, placed_pages = placed
+    for shape, size, page, position in zip(shared, sizes, pages, positions):
+        fit_uvs_into_atlas(shape, uvset_name, size, position, atlas_size)
+        store_atlas_assignment(shape, page, size, position, layout_keys[shape])
+    return max(page_count, placed_pages), repacked
+
+
+def layout_shapes_in_parallel(
+    shapes,
+    uvset_name,
+    settings,
+    engine=ENGINE_U3D,
+    allow_rotation=True,
+    workers=4,
+    runner=None,
+    retries=2,
+):
+    """
+    Lay out shapes in a pool of headless mayapy workers.
+    The shapes are exported in chunks to temporary Maya binary files, each
+    chunk is laid out by a worker process (retried on failure) and the
+    resulting UV sets are written back in chunk order.
+    settings maps each shape to (shell_padding, tile_padding, resolution).
+    runner defaults to LightmapParallel.MayapyWorkerRunner; pass a
+    LightmapParallel.FakeLayoutWorker to test without worker processes.
+    Returns the list of shapes that failed.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="lightmapLayout_")
+    try:
+        shapes_by_uuid = {cmds.ls(shape, uuid=True)[0]: shape for shape in shapes}
+        items = [
+            {"uuid": uuid, "settings": list(settings[shape])}
+            for uuid, shape in shapes_by_uuid.items()
+        ]
+
+        # More chunks than workers, so a slow chunk does not idle the pool
+        chunks = []
+        for index, chunk in enumerate(
+            LightmapParallel.chunk_items(items, workers * 2)
+        ):
+            scene = os.path.join(temp_dir, "chunk_{:03d}.mb".format(index))
+            cmds.select([shapes_by_uuid[item["uuid"]] for item in chunk], replace=True)
+            cmds.file(
+                scene,
+                exportSelected=True,
+                type="mayaBinary",
+                force=True,
+                preserveReferences=False,
+            )
+            chunks.append(
+                {
+                    "index": index,
+                    "scene": scene.replace("\\", "/"),
+                    "uvset": uvset_name,
+                    "engine": engine,
+                    "allow_rotation": allow_rotation,
+                    "shapes": chunk,
+                }
+            )
+
+        results, errors = LightmapParallel.run_parallel_chunks(
+            chunks,
+            runner or LightmapParallel.MayapyWorkerRunner(),
+            workers,
+            retries,
+        )
+        for index, error in sorted(errors.items()):
+            print("Error: Layout chunk {} failed ({}).".format(index, error))
+
+        merged, failed_uuids = LightmapParallel.merge_chunk_results(chunks, results)
+        for uuid, uv_data in merged:
+            write_uv_set(shapes_by_uuid[uuid], uvset_name, uv_data)
+        return [shapes_by_uuid[uuid] for uuid in failed_uuids]
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def get_unique_shape_nodes(shapes):
+    """
+    Drop repeated DAG paths to the same shape node (true Maya instances).
+    Laying out one path lays out every instance, since they share the data.
+    """
+    unique = {}
+    for shape in shapes:
+        uuid = (cmds.ls(shape, uuid=True) or [shape])[0]
+        unique.setdefault(uuid, shape)
+    return list(unique.values())
+
+
+def group_duplicate_shapes(shapes, shape_keys):
+    """
+    Group shapes with identical keys, e.g. identical topology and source UVs.
+    Returns {representative: [other members]} in selection order.
+    """
+    by_hash = {}
+    for shape in shapes:
+        by_hash.setdefault(shape_keys[shape], []).append(shape)
+    return {members[0]: members[1:] for members in by_hash.values()}
+
+
+def copy_uv_set_to_duplicates(duplicate_groups, uvset_name, failed):
+    """
+    Copy the laid out UV set of each representative to its duplicates, one
+    bulk read and one bulk write per shape. Duplicates of failed
+    representatives are added to failed. Returns the number of copies.
+    """
+    copied = 0
+    for representative, members in duplicate_groups.items():
+        if not members:
+            continue
+        if representative in failed:
+            failed.extend(members)
+            continue
+        uv_data = read_uv_set(representative, uvset_name)
+        for member in members:
+            write_uv_set(member, uvset_name, uv_data)
+            copied += 1
+    return copied
+
+
 def gather_mesh_shapes_from_selection(selection):
     mesh_shapes = []
     for obj in selection:
@@ -120,7 +780,40 @@ def gather_mesh_shapes_from_selection(selection):
     return mesh_shapes
 
 
-def run_layout_for_selection(uvset_name, shell_padding, tile_padding, resolution):
+def run_layout_for_selection(
+    uvset_name,
+    shell_padding,
+    tile_padding,
+    resolution,
+    batch=True,
+    use_cache=False,
+    dedupe=False,
+    engine=ENGINE_U3D,
+    allow_rotation=True,
+    texel_budget=None,
+    atlas_size=1024,
+    min_resolution=32,
+    max_resolution=2048,
+    validate=True,
+    preflight=True,
+    workers=0,
+    incremental=False,
+):
+    """
+    Create the lightmap UV set on the selected meshes and lay it out.
+    With a texel_budget (total texels for all lightmaps), each shape gets a
+    resolution from its world-space surface area instead of `resolution`,
+    and the results are packed into shared atlas pages of atlas_size.
+    With validate, the laid out UVs are rasterized at their resolution and
+    checked for overlaps and padding violations. With preflight, shapes that
+    would fail (empty, no 'map1', zero-area faces, non-manifold UVs) are
+    skipped with their reasons before any layout call. With workers > 0,
+    the layout runs in that many parallel mayapy processes. With incremental
+    (atlas mode only), shapes whose content and settings did not change keep
+    their atlas placement; changed or new shapes are fitted into the free
+    space left by every placed mesh in the scene, re-packing the selection
+    only when they do not fit.
+    """
     sel = cmds.ls(selection=True, long=True) or []
     if not sel:
         print("Error: Please select one or more mesh objects.")
@@ -129,23 +822,253 @@ def run_layout_for_selection(uvset_name, shell_padding, tile_padding, resolution
     if not mesh_shapes:
         print("Error: Please select one or more mesh objects.")
         return
-    processed = set()
-    for shape in mesh_shapes:
-        if shape in processed:
-            continue
-        processed.add(shape)
-        if uvset_name == "map1":
+    if uvset_name == "map1":
+        print(
+            "Error: Operation on 'map1' is prohibited. Please use a different UV set name."
+        )
+        return
+    if engine not in ENGINES:
+        print("Error: Unknown packing engine '{}'.".format(engine))
+        return
+    if engine == ENGINE_NUMPY and (om is None or LightmapPacker is None):
+        print("Error: The NumPy packing engine requires OpenMaya and NumPy.")
+        return
+    if validate and (om is None or LightmapPacker is None):
+        print("Error: Layout validation requires OpenMaya and NumPy. Skipped.")
+        validate = False
+    if not batch and engine == ENGINE_U3D:
+        processed = set()
+        laid_out = []
+        for shape in mesh_shapes:
+            if shape in processed:
+                continue
+            processed.add(shape)
+            if not ensure_uv_set_on_shape(shape, uvset_name):
+                continue
+            if not layout_uvs_for_shape(
+                shape, uvset_name, shell_padding, tile_padding, resolution
+            ):
+                continue
+            laid_out.append(shape)
+        print("Success: Lightmap UV layout complete for all selected objects.")
+        if validate and laid_out:
+            settings = {
+                shape: (shell_padding, tile_padding, resolution) for shape in laid_out
+            }
+            issues = report_layout_validation(laid_out, uvset_name, settings)
             print(
-                "Error: Operation on 'map1' is prohibited. Please use a different UV set name."
+                "Info: Validated {} layouts, {} with issues.".format(
+                    len(laid_out), issues
+                )
             )
-            return
-        if not ensure_uv_set_on_shape(shape, uvset_name):
-            continue
-        if not layout_uvs_for_shape(
-            shape, uvset_name, shell_padding, tile_padding, resolution
-        ):
-            continue
-    print("Success: Lightmap UV layout complete for all selected objects.")
+        return
+
+    if texel_budget and (om is None or LightmapPacker is None):
+        print("Error: Lightmap budgeting requires OpenMaya and NumPy.")
+        return
+    if (use_cache or dedupe) and (om is None or np is None):
+        print(
+            "Error: The layout cache and duplicate detection require OpenMaya "
+            "and NumPy. Both are disabled."
+        )
+        use_cache = dedupe = False
+    if workers > 0 and (om is None or LightmapParallel is None):
+        print("Error: Parallel layout requires OpenMaya and NumPy.")
+        return
+    if preflight and (om is None or LightmapPacker is None):
+        print("Error: Pre-flight checks require OpenMaya and NumPy. Skipped.")
+        preflight = False
+
+    start_time = time.time()
+
+    # Route doomed shapes to the skip list, then prepare all UV sets first,
+    # without per-shape logging
+    prepared = []
+    skipped = {}
+    for shape in get_unique_shape_nodes(mesh_shapes):
+        reasons = preflight_shape(shape) if preflight else []
+        if reasons:
+            skipped[shape] = ", ".join(reasons)
+        elif ensure_uv_set_on_shape(shape, uvset_name, verbose=False):
+            prepared.append(shape)
+        else:
+            skipped[shape] = "could not create UV set '{}'".format(uvset_name)
+
+    # Budget a resolution per shape from its world-space surface area
+    resolutions = {shape: resolution for shape in prepared}
+    if texel_budget:
+        areas = [compute_world_surface_area(shape) for shape in prepared]
+        sizes = LightmapPacker.compute_lightmap_budgets(
+            areas, texel_budget, min_resolution, max_resolution
+        )
+        resolutions = dict(zip(prepared, sizes.tolist()))
+        # Only possible when every shape is clamped to the minimum resolution
+        budgeted_texels = int((sizes * sizes).sum())
+        if budgeted_texels > texel_budget:
+            print(
+                "Warning: {} shapes at the minimum resolution of {}px need {:.2f} "
+                "megatexels, over the budget of {:.2f}.".format(
+                    len(prepared),
+                    min_resolution,
+                    budgeted_texels / 1e6,
+                    texel_budget / 1e6,
+                )
+            )
+    settings = {
+        shape: (shell_padding, tile_padding, resolutions[shape]) for shape in prepared
+    }
+
+    content_hashes = {}
+    if use_cache or dedupe or texel_budget:
+        content_hashes = {shape: compute_content_hash(shape) for shape in prepared}
+
+    # Keep shapes whose stored atlas placement was made for the same content
+    # and settings, including the newly budgeted resolution, so a changed
+    # texel budget re-sizes them; only the others are laid out and placed again
+    kept = {}
+    if texel_budget and incremental:
+        for shape in prepared:
+            placement = read_atlas_assignment(shape)
+            if placement is None or placement["page"] < 0:
+                continue
+            key = compute_layout_key(
+                content_hashes[shape], *settings[shape], engine, allow_rotation
+            )
+            size = placement["size"]
+            fits = size >= atlas_size or max(placement["position"]) + size <= atlas_size
+            if key == placement["layout_key"] and fits:
+                kept[shape] = placement
+    pending = [shape for shape in prepared if shape not in kept]
+
+    # Lay out one representative per group of identical meshes
+    if dedupe:
+        duplicate_groups = group_duplicate_shapes(
+            pending,
+            {shape: (content_hashes[shape], settings[shape]) for shape in pending},
+        )
+    else:
+        duplicate_groups = {shape: [] for shape in pending}
+    representatives = list(duplicate_groups)
+
+    # Reapply cached layouts and keep only the misses for u3dLayout
+    cache = LayoutCache() if use_cache else None
+    layout_keys = {}
+    to_layout = representatives
+    if cache is not None:
+        to_layout = []
+        for shape in representatives:
+            key = compute_layout_key(
+                content_hashes[shape], *settings[shape], engine, allow_rotation
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                write_uv_set(shape, uvset_name, cached)
+            else:
+                layout_keys[shape] = key
+                to_layout.append(shape)
+    prepare_time = time.time() - start_time
+
+    # Group the shapes by their layout settings so each group is laid out
+    # with as few MEL evaluations as possible
+    groups = {}
+    for shape in to_layout:
+        groups.setdefault(settings[shape], []).append(shape)
+
+    selection = cmds.ls(selection=True, long=True) or []
+    failed = []
+    if workers > 0:
+        failed += layout_shapes_in_parallel(
+            to_layout, uvset_name, settings, engine, allow_rotation, workers
+        )
+    else:
+        for group_settings, shapes in groups.items():
+            failed += layout_shape_group(
+                shapes, uvset_name, *group_settings, engine, allow_rotation
+            )
+    if selection:
+        cmds.select(selection, replace=True)
+
+    if cache is not None:
+        for shape in to_layout:
+            if shape not in failed:
+                cache.put(layout_keys[shape], read_uv_set(shape, uvset_name))
+        cache.evict()
+    copied = copy_uv_set_to_duplicates(duplicate_groups, uvset_name, failed)
+
+    # Validate before atlas packing, while every shape is still in its own tile.
+    # Duplicates share their representative's layout and are not re-checked.
+    validate_time = 0.0
+    issues = 0
+    laid_out = [shape for shape in representatives if shape not in failed]
+    if validate:
+        validate_start = time.time()
+        issues = report_layout_validation(laid_out, uvset_name, settings)
+        validate_time = time.time() - validate_start
+
+    atlas_count = 0
+    repacked = False
+    if texel_budget:
+        placed = [shape for shape in pending if shape not in failed]
+        atlas_keys = {
+            shape: compute_layout_key(
+                content_hashes[shape], *settings[shape], engine, allow_rotation
+            )
+            for shape in placed
+        }
+        atlas_keys.update(
+            (shape, placement["layout_key"]) for shape, placement in kept.items()
+        )
+        if incremental:
+            atlas_count, repacked = assign_shared_atlases_incremental(
+                placed, kept, uvset_name, resolutions, atlas_size, atlas_keys
+            )
+        else:
+            atlas_count = assign_shared_atlases(
+                placed, uvset_name, resolutions, atlas_size, atlas_keys
+            )
+    layout_time = time.time() - start_time - prepare_time
+
+    print(
+        "Success: Lightmap UV layout complete for {} shapes in {:.2f}s "
+        "(prepare {:.2f}s, layout {:.2f}s, {} setting groups, {} cache hits, "
+        "{} duplicates copied).".format(
+            len(prepared) - len(failed),
+            prepare_time + layout_time,
+            prepare_time,
+            layout_time,
+            len(groups),
+            len(representatives) - len(to_layout),
+            copied,
+        )
+    )
+    if validate and laid_out:
+        print(
+            "Info: Validated {} layouts in {:.2f}s, {} with issues.".format(
+                len(laid_out), validate_time, issues
+            )
+        )
+    if texel_budget:
+        print(
+            "Info: Packed into {} atlases of {}px ({:.2f} of {:.2f} megatexels).".format(
+                atlas_count,
+                atlas_size,
+                sum(min(r, atlas_size) ** 2 for r in resolutions.values()) / 1e6,
+                texel_budget / 1e6,
+            )
+        )
+    if kept:
+        print(
+            "Info: Incremental layout kept {} unchanged shapes{}.".format(
+                len(kept),
+                ", but they had to be re-packed to make room" if repacked else "",
+            )
+        )
+    for shape, reason in skipped.items():
+        print("Error: Skipped {}: {}.".format(shape, reason))
+    if failed:
+        print(
+            "Error: {} shapes failed: {}".format(len(failed), ", ".join(failed))
+        )
 
 
 def build_ui():
@@ -154,7 +1077,7 @@ def build_ui():
     window = cmds.window(
         WINDOW_NAME,
         title="Lightmap UV Layout Tool",
-        widthHeight=(380, 500),
+        widthHeight=(380, 910),
         sizeable=True,
         mxb=False,
         mnb=False,
@@ -182,6 +1105,61 @@ def build_ui():
     cmds.text(label="Packing resolution:")
     res_field = cmds.floatField(value=1024, minValue=0.0, maxValue=8196.0, pre=6)
 
+    batch_check = cmds.checkBox(
+        label="Batch mode (quiet, grouped u3dLayout calls)",
+        value=True,
+    )
+
+    cache_check = cmds.checkBox(
+        label="Use layout cache (skip unchanged meshes)",
+        value=True,
+    )
+
+    dedupe_check = cmds.checkBox(
+        label="Lay out duplicate meshes once",
+        value=True,
+    )
+
+    cmds.text(label="Packing engine:")
+    engine_menu = cmds.optionMenu()
+    for engine_name in ENGINES:
+        cmds.menuItem(label=engine_name)
+
+    rotate_check = cmds.checkBox(
+        label="Rotate shells (NumPy engine)",
+        value=True,
+    )
+
+    preflight_check = cmds.checkBox(
+        label="Skip meshes that fail pre-flight checks",
+        value=True,
+    )
+
+    validate_check = cmds.checkBox(
+        label="Validate padding and overlaps after layout",
+        value=True,
+    )
+
+    cmds.text(label="Parallel mayapy workers (0 = in this session):")
+    workers_field = cmds.intField(value=0, minValue=0, maxValue=64)
+
+    cmds.separator(height=6, style="in")
+    budget_check = cmds.checkBox(
+        label="Budget resolution by surface area (shared atlases)",
+        value=False,
+    )
+
+    cmds.text(label="Texel budget (megatexels):")
+    budget_field = cmds.floatField(value=16.0, minValue=0.1, maxValue=1024.0, pre=2)
+
+    cmds.text(label="Atlas size:")
+    atlas_field = cmds.intField(value=2048, minValue=64, maxValue=8192)
+
+    incremental_check = cmds.checkBox(
+        label="Incremental (keep unchanged shapes in their atlas)",
+        value=True,
+    )
+
     def on_execute(*args):
         uvset_name = cmds.textField(uv_field, query=True, text=True).strip()
         try:
@@ -199,7 +1177,37 @@ def build_ui():
         shell_padding = max(0.0, min(shell_padding, 100.0))
         tile_padding = max(0.0, min(tile_padding, 100.0))
         resolution = max(1.0, min(resolution, 8196.0))
-        run_layout_for_selection(uvset_name, shell_padding, tile_padding, resolution)
+        batch = cmds.checkBox(batch_check, query=True, value=True)
+        use_cache = cmds.checkBox(cache_check, query=True, value=True)
+        dedupe = cmds.checkBox(dedupe_check, query=True, value=True)
+        engine = cmds.optionMenu(engine_menu, query=True, value=True)
+        allow_rotation = cmds.checkBox(rotate_check, query=True, value=True)
+        texel_budget = None
+        if cmds.checkBox(budget_check, query=True, value=True):
+            budget = cmds.floatField(budget_field, query=True, value=True)
+            texel_budget = int(budget * 1e6)
+        atlas_size = cmds.intField(atlas_field, query=True, value=True)
+        incremental = cmds.checkBox(incremental_check, query=True, value=True)
+        validate = cmds.checkBox(validate_check, query=True, value=True)
+        preflight = cmds.checkBox(preflight_check, query=True, value=True)
+        workers = cmds.intField(workers_field, query=True, value=True)
+        run_layout_for_selection(
+            uvset_name,
+            shell_padding,
+            tile_padding,
+            resolution,
+            batch=batch,
+            use_cache=use_cache,
+            dedupe=dedupe,
+            engine=engine,
+            allow_rotation=allow_rotation,
+            texel_budget=texel_budget,
+            atlas_size=atlas_size,
+            validate=validate,
+            preflight=preflight,
+            workers=workers,
+            incremental=incremental,
+        )
 
     cmds.separator(height=6, style="in")
     cmds.button(label="Generate and Layout UVs", command=on_execute, height=30)
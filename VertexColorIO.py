@@ -0,0 +1,259 @@
+# Vertex color reads and writes for VertexColorTool and VertexColorManager
+# Colors are read through MFnMesh into a float32 NumPy array when OpenMaya
+# and NumPy are available, and through polyColorPerVertex otherwise.
+# Writes take per-mesh vertex ranges instead of a flattened selection.
+import itertools
+import re
+
+import maya.cmds as cmds
+
+import VertexColorMath as vcm
+
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    om = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VERTEX_PATTERN = re.compile(
+    r"^(?P<node>.+)\.vtx\[(?P<start>\d+)(?::(?P<stop>\d+))?\]$"
+)
+FACE_PATTERN = re.compile(r"^(?P<node>.+)\.(?:f|vtxFace)\[")
+
+
+def get_mesh_fn(mesh):
+    selection = om.MSelectionList()
+    selection.add(mesh)
+    return om.MFnMesh(selection.getDagPath(0))
+
+
+def color_array_to_numpy(colors):
+    """
+    (N, 4) float32 array of an MColorArray.
+    API 2.0 arrays do not expose the buffer protocol, so the channels are
+    streamed straight into one preallocated array instead of going through
+    a Python list of floats.
+    """
+    flat = np.fromiter(
+        itertools.chain.from_iterable(colors), dtype=np.float32, count=len(colors) * 4
+    )
+    return flat.reshape(-1, 4)
+
+
+def read_colors_api(mesh, color_set=None):
+    """(N, 3) float32 vertex colors of a color set (default: current set)."""
+    fn = get_mesh_fn(mesh)
+    colors = fn.getVertexColors(color_set or fn.currentColorSetName())
+    return color_array_to_numpy(colors)[:, :3]
+
+
+def read_face_vertex_colors(mesh, color_set=None):
+    """
+    (M, 3) float32 face-vertex colors in face order (requires OpenMaya and
+    NumPy). Unset face-vertex colors are -1.
+    """
+    fn = get_mesh_fn(mesh)
+    colors = fn.getFaceVertexColors(color_set or fn.currentColorSetName())
+    return color_array_to_numpy(colors)[:, :3]
+
+
+def read_colors_cmds(mesh, color_set=None):
+    """Flat [r, g, b, ...] vertex colors through the command layer."""
+    current = cmds.polyColorSet(mesh, query=True, currentColorSet=True)
+    current = current[0] if current else None
+    switch = color_set and color_set != current
+    if switch:
+        cmds.polyColorSet(mesh, currentColorSet=True, colorSet=color_set)
+    try:
+        return cmds.polyColorPerVertex(f"{mesh}.vtx[*]", query=True, rgb=True)
+    finally:
+        if switch:
+            cmds.polyColorSet(mesh, currentColorSet=True, colorSet=current)
+
+
+def read_mesh_colors(mesh, color_set=None):
+    """
+    Vertex colors of a mesh, or None if it has no vertices or no such color
+    set. Returns an (N, 3) float32 array via MFnMesh, or a flat
+    [r, g, b, ...] list via polyColorPerVertex when OpenMaya or NumPy is
+    missing. Both feed VertexColorMath.color_keys directly.
+    """
+    if cmds.polyEvaluate(mesh, vertex=True) == 0:
+        return None
+    color_sets = cmds.polyColorSet(mesh, query=True, allColorSets=True)
+    if not color_sets or (color_set and color_set not in color_sets):
+        return None
+    try:
+        if om is not None and np is not None:
+            return read_colors_api(mesh, color_set)
+        return read_colors_cmds(mesh, color_set) or None
+    except Exception:
+        return None
+
+
+def get_mesh_shapes(nodes):
+    """Mesh shapes of a list of transforms and/or shapes."""
+    shapes = []
+    for node in nodes:
+        if cmds.nodeType(node) == "mesh":
+            shapes.append(node)
+        else:
+            shapes.extend(
+                cmds.listRelatives(
+                    node, shapes=True, type="mesh", fullPath=True, noIntermediate=True
+                )
+                or []
+            )
+    return shapes
+
+
+def selection_vertex_ranges(items=None):
+    """
+    {mesh: [(start, stop), ...]} for the selection, without flattening it.
+    Whole objects map to all of their vertices; edges, faces and UVs are
+    converted to their vertices (see apply_selection_color for writes that
+    keep face borders).
+    """
+    if items is None:
+        items = cmds.ls(selection=True, long=True) or []
+
+    targets = {}
+    objects = [item for item in items if "." not in item]
+    components = [item for item in items if "." in item]
+
+    for mesh in get_mesh_shapes(objects):
+        count = cmds.polyEvaluate(mesh, vertex=True)
+        if count:
+            targets.setdefault(mesh, []).append((0, count - 1))
+
+    vertices = (
+        cmds.polyListComponentConversion(components, toVertex=True) or []
+        if components
+        else []
+    )
+    shapes = {}
+    for vertex in vertices:
+        match = VERTEX_PATTERN.match(vertex)
+        if not match:
+            continue
+        node = match.group("node")
+        if node not in shapes:
+            found = get_mesh_shapes(cmds.ls(node, long=True) or [])
+            shapes[node] = found[0] if found else None
+        if shapes[node]:
+            start = int(match.group("start"))
+            stop = int(match.group("stop") or start)
+            targets.setdefault(shapes[node], []).append((start, stop))
+
+    return {mesh: vcm.merge_ranges(ranges) for mesh, ranges in targets.items()}
+
+
+def split_face_components(items):
+    """
+    ({mesh: [face / vtxFace components]}, other items) for a selection.
+    The components are kept as the unflattened strings of the selection.
+    """
+    faces = {}
+    others = []
+    shapes = {}
+    for item in items:
+        match = FACE_PATTERN.match(item)
+        if not match:
+            others.append(item)
+            continue
+        node = match.group("node")
+        if node not in shapes:
+            found = get_mesh_shapes(cmds.ls(node, long=True) or [])
+            shapes[node] = found[0] if found else None
+        if shapes[node]:
+            faces.setdefault(shapes[node], []).append(item)
+    return faces, others
+
+
+def apply_selection_color(rgb, undoable=True, items=None):
+    """
+    Set one color on the selection and return the meshes that changed.
+    undoable: faces and face-vertices are colored as selected, per
+    face-vertex, so hard color borders between faces are kept; everything
+    else goes through vertex ranges. Otherwise all components are converted
+    to vertices for one MFnMesh write per mesh, which also overwrites the
+    shared vertices of neighboring faces.
+    """
+    if items is None:
+        items = cmds.ls(selection=True, long=True) or []
+    faces = {}
+    if undoable or om is None:
+        faces, items = split_face_components(items)
+    targets = selection_vertex_ranges(items) if items else {}
+
+    for mesh, ranges in targets.items():
+        fill_vertex_color(mesh, ranges, rgb, undoable)
+    for mesh, components in faces.items():
+        cmds.polyColorPerVertex(components, rgb=rgb, colorDisplayOption=True)
+    return list(dict.fromkeys(list(targets) + list(faces)))
+
+
+def set_colors_api(mesh, indices, color_array):
+    """One MFnMesh.setVertexColors call, through a modifier for meshes with history."""
+    fn = get_mesh_fn(mesh)
+    modifier = om.MDGModifier()
+    fn.setVertexColors(color_array, indices.tolist(), modifier)
+    modifier.doIt()
+    cmds.setAttr(f"{mesh}.displayColors", True)
+
+
+def fill_vertex_color(mesh, ranges, rgb, undoable=True):
+    """
+    Set one color on vertex ranges of a mesh.
+    undoable: one polyColorPerVertex call with vtx[a:b] range strings,
+    recorded in the undo queue. Otherwise one MFnMesh.setVertexColors call,
+    which is faster on large meshes but cannot be undone.
+    """
+    if undoable or om is None:
+        cmds.polyColorPerVertex(
+            vcm.range_components(mesh, ranges), rgb=rgb, colorDisplayOption=True
+        )
+        return
+
+    indices = vcm.ranges_to_indices(ranges)
+    set_colors_api(mesh, indices, om.MColorArray(len(indices), om.MColor(rgb)))
+
+
+def write_vertex_colors(mesh, indices, colors, undoable=True):
+    """
+    Set per-vertex colors on a mesh (colors[i] goes to indices[i]).
+    undoable: one polyColorPerVertex call per distinct (3-decimal) color
+    with vtx[a:b] range strings, so the cost grows with the number of
+    distinct colors written. Otherwise one MFnMesh.setVertexColors call for
+    the whole mesh, which cannot be undone.
+    """
+    if undoable or om is None or np is None:
+        if np is None:
+            keys = [vcm.color_to_key(rgb) for rgb in colors]
+        else:
+            keys = vcm.color_keys(colors)
+        write_vertex_color_keys(mesh, indices, keys)
+        return
+
+    indices = np.asarray(indices)
+    colors = np.asarray(colors, dtype=np.float64).reshape(-1, 3)
+    color_array = om.MColorArray([om.MColor(rgb) for rgb in colors.tolist()])
+    set_colors_api(mesh, indices, color_array)
+
+
+def write_vertex_color_keys(mesh, indices, keys, undoable=True):
+    """
+    write_vertex_colors for packed color keys (keys[i] goes to indices[i]).
+    The undoable path groups the keys directly, without unpacking them.
+    """
+    if undoable or om is None or np is None:
+        for key, group in vcm.group_key_indices(keys, indices):
+            ranges = vcm.indices_to_ranges(group)
+            fill_vertex_color(mesh, ranges, list(vcm.key_to_color(key)))
+        return
+
+    write_vertex_colors(mesh, indices, vcm.keys_to_colors(keys), undoable=False)
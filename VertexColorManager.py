@@ -1,6 +1,17 @@
 import maya.cmds as cmds
 from functools import partial
 
+try:
+    import VertexColorMath as vcm
+    from VertexColorIO import apply_selection_color, read_mesh_colors
+except ImportError:
+    vcm = None
+
+MISSING_MODULES_MESSAGE = (
+    "This tool requires VertexColorMath.py and VertexColorIO.py "
+    "next to this script on the Maya script path."
+)
+
 
 class VertexColorTool:
     """
@@ -10,9 +21,17 @@ class VertexColorTool:
     - [Fix] Scene Colorsが取得できない問題を修正 (中間オブジェクトの除外とカラーセット存在確認)
     - [New] シーン全体の頂点カラー表示切り替えボタンを追加
     - [Update] 選択オブジェクトの表示切り替えをトグルボタン化
+    - [Perf] 頂点カラーの丸めと重複除去を VertexColorMath (NumPy) でベクトル化
+    - [Perf] 頂点カラーの読み込みを MFnMesh + NumPy に変更 (cmds はフォールバック)
+    - [Perf] 適用時に選択をフラット化せず一括書き込みし、変更したメッシュだけを再取得
     """
 
     def __init__(self):
+        # 補助モジュールが無い場合はウィンドウを作らずに終了
+        if vcm is None:
+            cmds.warning(MISSING_MODULES_MESSAGE)
+            return
+
         self.window_name = "vertexColorToolWindow"
         self.title = "Vertex Color Assigner"
         self.size = (320, 660)
@@ -41,6 +60,8 @@ class VertexColorTool:
         ]
 
         self.widgets = {}
+        # {mesh: {color key: 頂点数}} (適用後は変更したメッシュだけ読み直す)
+        self.mesh_color_counts = {}
         self.build_ui()
         self.refresh_color_list()
 
@@ -105,6 +126,11 @@ class VertexColorTool:
             height=40,
             bgc=(0.3, 0.5, 0.3),
         )
+        self.widgets["undoable"] = cmds.checkBox(
+            label="Undoable (off: faster MFnMesh write, no undo)",
+            value=True,
+            p=main_col,
+        )
 
         # --- Palette ---
         cmds.separator(h=5, style="in", p=main_col)
@@ -246,51 +272,51 @@ class VertexColorTool:
     # ==========================================
 
     def apply_color(self, *args):
-        selection = cmds.ls(selection=True, flatten=True, long=True)
-        if not selection:
+        if not cmds.ls(selection=True):
             cmds.warning("Please select objects or components.")
             return
+
+        undoable = cmds.checkBox(self.widgets["undoable"], query=True, value=True)
+        targets = []
+        cmds.undoInfo(openChunk=True, chunkName="applyVertexColor")
         try:
-            cmds.polyColorPerVertex(
-                selection, rgb=self.current_color, colorDisplayOption=True
-            )
+            # 選択をフラット化せず、面はそのまま、それ以外は頂点範囲で書き込む
+            targets = apply_selection_color(self.current_color, undoable)
             print(f"Applied color {self.current_color}")
-            self.refresh_color_list()
         except Exception as e:
             cmds.warning(f"Error applying color: {e}")
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        # 変更したメッシュだけを読み直す
+        self.refresh_color_list(meshes=list(targets))
+
+    def read_color_counts(self, mesh):
+        colors = read_mesh_colors(mesh)
+        if colors is None:
+            self.mesh_color_counts.pop(mesh, None)
+        else:
+            self.mesh_color_counts[mesh] = vcm.count_color_keys(vcm.color_keys(colors))
 
-    def refresh_color_list(self, *args):
-        """シーン内の使用カラーリストを更新 (修正版)"""
+    def refresh_color_list(self, *args, meshes=None):
+        """シーン内の使用カラーリストを更新 (meshes 指定時はそのメッシュだけを読み直す)"""
         cmds.textScrollList(self.widgets["scene_list"], edit=True, removeAll=True)
-        scene_colors = set()
 
-        # [修正1] noIntermediate=True でヒストリ用の中間メッシュを除外
-        meshes = cmds.ls(type="mesh", noIntermediate=True, long=True) or []
+        if meshes is None:
+            # [修正1] noIntermediate=True でヒストリ用の中間メッシュを除外
+            self.mesh_color_counts = {}
+            meshes = cmds.ls(type="mesh", noIntermediate=True, long=True) or []
 
+        # [修正2] 頂点やカラーセットが無いメッシュは None が返るのでスキップ
         for mesh in meshes:
-            # 頂点数の簡易チェック
-            if cmds.polyEvaluate(mesh, vertex=True) == 0:
-                continue
-
-            # [修正2] カラーセットが存在しないメッシュはスキップ (これがエラーの主原因になりやすい)
-            color_sets = cmds.polyColorSet(mesh, query=True, allColorSets=True)
-            if not color_sets:
-                continue
+            self.read_color_counts(mesh)
 
-            try:
-                # 頂点カラー取得
-                colors = cmds.polyColorPerVertex(f"{mesh}.vtx[*]", query=True, rgb=True)
-                if not colors:
-                    continue
-
-                for i in range(0, len(colors), 3):
-                    c = tuple(round(v, 3) for v in colors[i : i + 3])
-                    scene_colors.add(c)
-            except Exception:
-                # 万が一特定メッシュで失敗しても全体を止めない
-                pass
+        scene_colors = set()
+        for counts in self.mesh_color_counts.values():
+            scene_colors.update(counts)
 
-        for c in sorted(list(scene_colors)):
+        for key in sorted(scene_colors):
+            c = vcm.key_to_color(key)
             cmds.textScrollList(
                 self.widgets["scene_list"],
                 edit=True,
@@ -313,25 +339,19 @@ class VertexColorTool:
 
         cmds.select(clear=True)
         to_select = []
+        target_key = vcm.color_to_key(target)
 
         meshes = cmds.ls(type="mesh", noIntermediate=True, long=True) or []
         for mesh in meshes:
             # カラーセットがないメッシュは検索対象外
-            if not cmds.polyColorSet(mesh, query=True, allColorSets=True):
-                continue
-
-            colors = cmds.polyColorPerVertex(f"{mesh}.vtx[*]", query=True, rgb=True)
-            if not colors:
+            colors = read_mesh_colors(mesh)
+            if colors is None:
                 continue
 
-            for i in range(0, len(colors), 3):
-                c = tuple(round(v, 3) for v in colors[i : i + 3])
-                target_r = tuple(round(v, 3) for v in target)
-                if c == target_r:
-                    transform = cmds.listRelatives(mesh, parent=True, fullPath=True)
-                    if transform:
-                        to_select.append(transform[0])
-                    break
+            if vcm.has_color_key(vcm.color_keys(colors), target_key):
+                transform = cmds.listRelatives(mesh, parent=True, fullPath=True)
+                if transform:
+                    to_select.append(transform[0])
 
         if to_select:
             cmds.select(to_select)
@@ -388,4 +408,5 @@ class VertexColorTool:
 
 
 # 実行
-VertexColorTool()
+if __name__ == "__main__":
+    VertexColorTool()
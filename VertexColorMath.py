@@ -0,0 +1,488 @@
+# Vertex color math shared by VertexColorTool and VertexColorManager
+# (no Maya dependency). Colors are quantized to 3 decimals and packed into
+# one uint32 key per vertex: ((r * 1001) + g) * 1001 + b with r, g, b in
+# 0..1000. Uses NumPy when available and falls back to plain Python.
+import colorsys
+import math
+from array import array
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+QUANTIZE_STEPS = 1000
+KEY_BASE = QUANTIZE_STEPS + 1
+# Vertices without a color are returned as -1 by Maya; they get their own key
+UNSET_KEY = 0xFFFFFFFF
+UNSET_COLOR = (-1.0, -1.0, -1.0)
+
+SORT_MODES = ("Count", "Hue", "Luminance", "RGB")
+LUMINANCE_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+# sRGB (D65) -> XYZ and Lab constants
+_SRGB_TO_XYZ_ROWS = (
+    (0.4124564, 0.3575761, 0.1804375),
+    (0.2126729, 0.7151522, 0.0721750),
+    (0.0193339, 0.1191920, 0.9503041),
+)
+_D65_WHITE = (0.95047, 1.0, 1.08883)
+LAB_EPSILON = 216.0 / 24389.0
+LAB_KAPPA = 24389.0 / 27.0 / 116.0
+
+if np is not None:
+    SRGB_TO_XYZ = np.array(_SRGB_TO_XYZ_ROWS)
+    D65_WHITE = np.array(_D65_WHITE)
+    # The 3x3x3 block of grid cells around a cell
+    NEIGHBOUR_OFFSETS = np.stack(
+        np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing="ij"), axis=-1
+    ).reshape(-1, 3)
+
+
+def color_to_key(rgb):
+    """Packed key of one color. Channels above 1.0 are clamped."""
+    if min(rgb) < 0.0:
+        return UNSET_KEY
+    r, g, b = (round(min(v, 1.0) * QUANTIZE_STEPS) for v in rgb)
+    return (r * KEY_BASE + g) * KEY_BASE + b
+
+
+def key_to_color(key):
+    """Quantized (r, g, b) tuple of a packed key."""
+    key = int(key)
+    if key == UNSET_KEY:
+        return UNSET_COLOR
+    rg, b = divmod(key, KEY_BASE)
+    r, g = divmod(rg, KEY_BASE)
+    return (r / QUANTIZE_STEPS, g / QUANTIZE_STEPS, b / QUANTIZE_STEPS)
+
+
+def keys_to_colors(keys):
+    """(N, 3) float array of packed keys; unset keys decode to -1."""
+    keys = np.asarray(keys, dtype=np.int64)
+    rgb = np.stack(
+        [keys // (KEY_BASE * KEY_BASE), keys // KEY_BASE % KEY_BASE, keys % KEY_BASE],
+        axis=1,
+    ) / float(QUANTIZE_STEPS)
+    rgb[keys == UNSET_KEY] = UNSET_COLOR
+    return rgb
+
+
+def color_keys(colors):
+    """
+    Packed keys for a flat [r, g, b, r, g, b, ...] buffer, one per vertex.
+    Returns a uint32 ndarray, or an array("L") without NumPy.
+    """
+    if np is None:
+        return array(
+            "L", (color_to_key(colors[i : i + 3]) for i in range(0, len(colors), 3))
+        )
+
+    rgb = np.asarray(colors, dtype=np.float64).reshape(-1, 3)
+    q = np.rint(np.clip(rgb, 0.0, 1.0) * QUANTIZE_STEPS).astype(np.uint32)
+    keys = (q[:, 0] * KEY_BASE + q[:, 1]) * KEY_BASE + q[:, 2]
+    keys[(rgb < 0.0).any(axis=1)] = UNSET_KEY
+    return keys
+
+
+def count_color_keys(keys):
+    """{key: vertex count} of a key array."""
+    if np is None:
+        return dict(Counter(keys))
+    unique, counts = np.unique(keys, return_counts=True)
+    return dict(zip(unique.tolist(), counts.tolist()))
+
+
+def has_color_key(keys, key):
+    if np is None:
+        return key in keys
+    return bool(np.any(keys == key))
+
+
+def find_key_indices(keys, key):
+    """Vertex indices whose key equals `key`."""
+    if np is None:
+        return array("i", (i for i, k in enumerate(keys) if k == key))
+    return np.nonzero(keys == key)[0]
+
+
+def indices_to_ranges(indices):
+    """
+    Runs of consecutive values in sorted, unique vertex indices, as
+    inclusive (start, stop) pairs: [3, 4, 5, 9] -> [(3, 5), (9, 9)].
+    """
+    if len(indices) == 0:
+        return []
+    if np is None:
+        ranges = []
+        for index in indices:
+            if ranges and index == ranges[-1][1] + 1:
+                ranges[-1][1] = index
+            else:
+                ranges.append([index, index])
+        return [(start, stop) for start, stop in ranges]
+
+    indices = np.asarray(indices)
+    breaks = np.flatnonzero(np.diff(indices) != 1)
+    starts = np.concatenate([indices[:1], indices[breaks + 1]])
+    stops = np.concatenate([indices[breaks], indices[-1:]])
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def merge_ranges(ranges):
+    """
+    Union of inclusive (start, stop) runs, sorted by start, with touching
+    runs joined: [(5, 9), (0, 3), (4, 4)] -> [(0, 9)].
+    The NumPy path joins runs against the running maximum of the stops.
+    """
+    if not ranges:
+        return []
+    if np is None:
+        merged = []
+        for start, stop in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], stop)
+            else:
+                merged.append([start, stop])
+        return [(start, stop) for start, stop in merged]
+
+    runs = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+    runs = runs[np.argsort(runs[:, 0], kind="stable")]
+    ends = np.maximum.accumulate(runs[:, 1])
+    breaks = np.flatnonzero(runs[1:, 0] > ends[:-1] + 1)
+    starts = runs[np.concatenate([[0], breaks + 1]), 0]
+    stops = ends[np.concatenate([breaks, [len(runs) - 1]])]
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def ranges_to_indices(ranges):
+    """Inclusive (start, stop) runs expanded to vertex indices."""
+    if np is None:
+        return array("i", (i for start, stop in ranges for i in range(start, stop + 1)))
+    if not ranges:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate([np.arange(start, stop + 1) for start, stop in ranges])
+
+
+def range_components(node, ranges, component="vtx"):
+    """Component strings for runs, e.g. ["pCube1.vtx[0:2]", "pCube1.vtx[5]"]."""
+    return [
+        f"{node}.{component}[{start}]"
+        if start == stop
+        else f"{node}.{component}[{start}:{stop}]"
+        for start, stop in ranges
+    ]
+
+
+def sort_color_keys(keys, counts, mode="Count"):
+    """
+    Order keys for display: "Count" (most used first), "Hue" (grays first),
+    "Luminance" (dark to bright) or "RGB". Ties keep RGB order.
+    counts is aligned with keys.
+    """
+    if np is None:
+        pairs = sorted(zip(keys, counts))
+        if mode == "Count":
+            pairs.sort(key=lambda pair: -pair[1])
+        elif mode == "Hue":
+            pairs.sort(key=lambda pair: _hue(key_to_color(pair[0])))
+        elif mode == "Luminance":
+            pairs.sort(key=lambda pair: _luminance(key_to_color(pair[0])))
+        return [key for key, _ in pairs]
+
+    keys = np.asarray(keys, dtype=np.int64)
+    if mode == "Count":
+        order = np.lexsort((keys, -np.asarray(counts)))
+    elif mode == "Hue":
+        order = np.lexsort((keys, _hues(keys_to_colors(keys))))
+    elif mode == "Luminance":
+        order = np.lexsort((keys, keys_to_colors(keys) @ LUMINANCE_WEIGHTS))
+    else:
+        order = np.argsort(keys, kind="stable")
+    return keys[order].tolist()
+
+
+def _hue(rgb):
+    if max(rgb) == min(rgb):
+        return -1.0
+    return colorsys.rgb_to_hsv(*rgb)[0]
+
+
+def _luminance(rgb):
+    return sum(w * v for w, v in zip(LUMINANCE_WEIGHTS, rgb))
+
+
+def _hues(rgb):
+    """Vectorized HSV hue in [0, 1); grays get -1 so they sort first."""
+    r, g, b = rgb.T
+    high = rgb.max(axis=1)
+    delta = high - rgb.min(axis=1)
+    safe = np.where(delta > 0.0, delta, 1.0)
+    hue = np.where(
+        high == r,
+        ((g - b) / safe) % 6.0,
+        np.where(high == g, (b - r) / safe + 2.0, (r - g) / safe + 4.0),
+    ) / 6.0
+    hue[delta == 0.0] = -1.0
+    return hue
+
+
+def rgb_to_lab(rgb):
+    """CIE Lab (D65) of (N, 3) sRGB colors in 0..1."""
+    rgb = np.clip(np.asarray(rgb, dtype=np.float64), 0.0, 1.0)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ SRGB_TO_XYZ.T / D65_WHITE
+    f = np.where(xyz > LAB_EPSILON, np.cbrt(xyz), xyz * LAB_KAPPA + 16.0 / 116.0)
+    lightness = 116.0 * f[:, 1] - 16.0
+    return np.stack(
+        [lightness, 500.0 * (f[:, 0] - f[:, 1]), 200.0 * (f[:, 1] - f[:, 2])], axis=1
+    )
+
+
+def _rgb_to_lab_single(rgb):
+    """Pure-Python rgb_to_lab for one color."""
+    linear = [
+        v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+        for v in (min(max(c, 0.0), 1.0) for c in rgb)
+    ]
+    xyz = [
+        sum(m * v for m, v in zip(row, linear)) / white
+        for row, white in zip(_SRGB_TO_XYZ_ROWS, _D65_WHITE)
+    ]
+    f = [
+        v ** (1.0 / 3.0) if v > LAB_EPSILON else v * LAB_KAPPA + 16.0 / 116.0
+        for v in xyz
+    ]
+    return (116.0 * f[1] - 16.0, 500.0 * (f[0] - f[1]), 200.0 * (f[1] - f[2]))
+
+
+class ColorGrid:
+    """
+    Uniform grid over the unique colors of a scene, for tolerance queries.
+    metric "rgb": per-channel tolerance (Chebyshev distance in RGB).
+    metric "lab": Delta E 1976 (Euclidean distance in Lab).
+    The cell size equals the tolerance, so a query only visits the 3x3x3
+    cells around the query color. UNSET_KEY is left out: uncolored vertices
+    have no position in color space (Lab would clip them to black).
+    """
+
+    def __init__(self, keys, tolerance, metric="rgb"):
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.keys = self.keys[self.keys != UNSET_KEY]
+        self.tolerance = tolerance
+        self.metric = metric
+        colors = keys_to_colors(self.keys)
+        self.points = rgb_to_lab(colors) if metric == "lab" else colors
+
+        self.cell_size = max(tolerance, 1e-6)
+        cells = np.floor(self.points / self.cell_size).astype(np.int64)
+        self.low = cells.min(axis=0) if len(cells) else np.zeros(3, np.int64)
+        self.high = cells.max(axis=0) if len(cells) else np.zeros(3, np.int64)
+        # One spare cell on each side so neighbour lookups never wrap
+        self.dims = self.high - self.low + 3
+        cell_ids = self.pack_cells(cells)
+        self.order = np.argsort(cell_ids, kind="stable")
+        self.sorted_ids = cell_ids[self.order]
+
+    def pack_cells(self, cells):
+        x, y, z = np.moveaxis(cells - self.low + 1, -1, 0)
+        return (x * self.dims[1] + y) * self.dims[2] + z
+
+    def query(self, rgb):
+        """Keys of the unique colors within tolerance of rgb."""
+        if len(self.keys) == 0:
+            return self.keys
+        if self.metric == "lab":
+            point = rgb_to_lab([rgb])[0]
+        else:
+            point = np.asarray(rgb, dtype=np.float64)
+        cell = np.floor(point / self.cell_size).astype(np.int64)
+        # Clamp into the occupied cells; matches can only lie next to them
+        cell = np.clip(cell, self.low, self.high)
+        ids = self.pack_cells(cell + NEIGHBOUR_OFFSETS)
+        starts = np.searchsorted(self.sorted_ids, ids, side="left")
+        stops = np.searchsorted(self.sorted_ids, ids, side="right")
+        candidates = np.concatenate(
+            [self.order[start:stop] for start, stop in zip(starts, stops)]
+        )
+
+        delta = self.points[candidates] - point
+        if self.metric == "lab":
+            inside = np.einsum("ij,ij->i", delta, delta) <= self.tolerance**2
+        else:
+            inside = np.abs(delta).max(axis=1) <= self.tolerance
+        return self.keys[candidates[inside]]
+
+
+def match_color_keys(keys, rgb, tolerance=0.0, metric="rgb", grid=None):
+    """
+    Keys among `keys` within tolerance of rgb ("rgb": per channel,
+    "lab": Delta E). Tolerance 0 matches the exact 3-decimal key only.
+    Uncolored vertices (UNSET_KEY) only match an unset target.
+    Pass a prebuilt ColorGrid to reuse it across queries.
+    """
+    target = color_to_key(rgb)
+    if tolerance <= 0.0 or target == UNSET_KEY:
+        return [target] if target in set(keys) else []
+
+    if np is None:
+        keys = [key for key in keys if key != UNSET_KEY]
+        if metric == "lab":
+            center = _rgb_to_lab_single(rgb)
+            return [
+                key
+                for key in keys
+                if math.dist(_rgb_to_lab_single(key_to_color(key)), center)
+                <= tolerance
+            ]
+        return [
+            key
+            for key in keys
+            if max(abs(a - b) for a, b in zip(key_to_color(key), rgb)) <= tolerance
+        ]
+
+    grid = grid or ColorGrid(keys, tolerance, metric)
+    return grid.query(rgb).tolist()
+
+
+def find_keys_indices(keys, matched_keys):
+    """Vertex indices whose key is one of matched_keys."""
+    if len(matched_keys) == 1:
+        return find_key_indices(keys, matched_keys[0])
+    if np is None:
+        matched_keys = set(matched_keys)
+        return array("i", (i for i, k in enumerate(keys) if k in matched_keys))
+    return np.nonzero(np.isin(keys, np.asarray(matched_keys, dtype=keys.dtype)))[0]
+
+
+def group_key_indices(keys, indices):
+    """
+    [(key, sorted indices), ...] grouping indices[i] by keys[i], from one
+    lexsort instead of one comparison pass per distinct key.
+    """
+    if np is None:
+        groups = {}
+        for index, key in zip(indices, keys):
+            groups.setdefault(key, []).append(index)
+        return [(key, sorted(group)) for key, group in groups.items()]
+    keys = np.asarray(keys)
+    indices = np.asarray(indices)
+    if len(keys) == 0:
+        return []
+    order = np.lexsort((indices, keys))
+    keys = keys[order]
+    indices = indices[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return [
+        (int(keys[start]), group)
+        for start, group in zip(starts, np.split(indices, starts[1:]))
+    ]
+
+
+def nearest_centers(points, centers, chunk_size=16384):
+    """(labels, squared distances) of each point's nearest center."""
+    labels = np.empty(len(points), dtype=np.int64)
+    distances = np.empty(len(points))
+    center_norms = (centers**2).sum(axis=1)
+    for start in range(0, len(points), chunk_size):
+        chunk = points[start : start + chunk_size]
+        # |p - c|^2 without the |p|^2 term, which does not change the argmin
+        partial_d2 = center_norms - 2.0 * (chunk @ centers.T)
+        nearest = partial_d2.argmin(axis=1)
+        labels[start : start + chunk_size] = nearest
+        distances[start : start + chunk_size] = (
+            partial_d2[np.arange(len(chunk)), nearest] + (chunk**2).sum(axis=1)
+        )
+    return labels, np.maximum(distances, 0.0)
+
+
+def kmeans_colors(colors, weights, k, iterations=30, seed=0):
+    """
+    Weighted k-means of (N, 3) colors with k-means++ seeding.
+    Returns (centers, labels, squared distance of each color to its center).
+    """
+    colors = np.asarray(colors, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    k = max(1, min(k, len(colors)))
+
+    centers = [colors[rng.choice(len(colors), p=weights / weights.sum())]]
+    d2 = ((colors - centers[0]) ** 2).sum(axis=1)
+    while len(centers) < k:
+        p = d2 * weights
+        if p.sum() <= 0.0:
+            # Fewer distinct colors than k
+            break
+        centers.append(colors[rng.choice(len(colors), p=p / p.sum())])
+        d2 = np.minimum(d2, ((colors - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        labels, _ = nearest_centers(colors, centers)
+        totals = np.bincount(labels, weights, minlength=len(centers))
+        sums = np.stack(
+            [
+                np.bincount(labels, weights * colors[:, axis], minlength=len(centers))
+                for axis in range(3)
+            ],
+            axis=1,
+        )
+        moved = np.where(
+            totals[:, None] > 0, sums / np.maximum(totals, 1e-12)[:, None], centers
+        )
+        if np.allclose(moved, centers, atol=0.5 / QUANTIZE_STEPS):
+            centers = moved
+            break
+        centers = moved
+
+    labels, d2 = nearest_centers(colors, centers)
+    return centers, labels, d2
+
+
+def reduce_palette(keys, counts, target_count=16, max_error=0.0, max_colors=256):
+    """
+    Cluster the colors of `keys` (weighted by their vertex counts) into a
+    smaller palette. With max_error > 0 the palette doubles from 2 colors
+    until every color is within max_error (RGB distance) of its center or
+    max_colors is reached; otherwise it has target_count colors.
+    Returns (palette keys, new key for each input key).
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    colors = keys_to_colors(keys)
+    if max_error > 0.0:
+        k = 2
+        while True:
+            centers, labels, d2 = kmeans_colors(colors, counts, k)
+            if np.sqrt(d2.max()) <= max_error or k >= min(len(keys), max_colors):
+                break
+            k *= 2
+    else:
+        centers, labels, _ = kmeans_colors(colors, counts, target_count)
+
+    center_keys = color_keys(centers).astype(np.int64)
+    return np.unique(center_keys), center_keys[labels]
+
+
+def remap_keys(keys, source_keys, target_keys):
+    """
+    Per-vertex remap of a key array through source_keys[i] -> target_keys[i].
+    Returns (indices of changed vertices, their new keys).
+    """
+    if np is None:
+        mapping = dict(zip(source_keys, target_keys))
+        changed = [
+            (i, mapping[k]) for i, k in enumerate(keys) if mapping.get(k, k) != k
+        ]
+        return array("i", (i for i, _ in changed)), array("L", (k for _, k in changed))
+
+    source_keys = np.asarray(source_keys, dtype=np.int64)
+    target_keys = np.asarray(target_keys, dtype=np.int64)
+    order = np.argsort(source_keys)
+    source_keys, target_keys = source_keys[order], target_keys[order]
+
+    keys = np.asarray(keys, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(source_keys, keys), len(source_keys) - 1)
+    new_keys = np.where(source_keys[positions] == keys, target_keys[positions], keys)
+    changed = np.nonzero(new_keys != keys)[0]
+    return changed, new_keys[changed]
@@ -1,6 +1,142 @@
 import maya.cmds as cmds
 from functools import partial
 
+try:
+    import VertexColorMath as vcm
+    from VertexColorIO import (
+        apply_selection_color,
+        read_mesh_colors,
+        write_vertex_color_keys,
+    )
+except ImportError:
+    vcm = None
+
+MISSING_MODULES_MESSAGE = (
+    "This tool requires VertexColorMath.py and VertexColorIO.py "
+    "next to this script on the Maya script path."
+)
+
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    om = None
+
+# 色の一致判定モード: (表示名, 許容値の距離)
+MATCH_MODES = (("Exact", None), ("RGB Tolerance", "rgb"), ("Delta E (Lab)", "lab"))
+
+# Scene Colors の1ページに表示する行数
+PAGE_SIZE = 50
+
+# 頂点カラーの変更で dirty になるメッシュのプラグ (先頭一致)
+COLOR_PLUG_NAMES = ("inMesh", "colorSet", "colorPerVertex", "vertexColor")
+
+
+class SceneColorIndex:
+    """
+    シーン内の頂点カラーのインデックス
+
+    メッシュを1回走査して、頂点ごとのカラーキー (uint32) とキーごとの頂点数を保持する。
+    カラーごとの頂点インデックス配列はキー配列から np.nonzero で取り出す。
+    メッシュはUUIDで管理するため、リネームやペアレント変更後もそのまま使える。
+    汚れた (dirty) メッシュだけを次回の問い合わせ時に読み直す。
+    許容値付きの検索はユニークカラーの一様グリッド (VertexColorMath.ColorGrid) を使う。
+    """
+
+    def __init__(self):
+        # {uuid: (頂点ごとのキー配列, {key: 頂点数})}
+        self.mesh_colors = {}
+        self.dirty = set()
+        self.built = False
+        # 内容が変わるたびに増やし、グリッドのキャッシュを無効化する
+        self.version = 0
+        self.grid_cache = None
+
+    def build(self):
+        """シーン全体を1回走査してインデックスを作り直す"""
+        self.mesh_colors = {}
+        meshes = cmds.ls(type="mesh", noIntermediate=True, long=True) or []
+        for mesh in meshes:
+            self.read_mesh(mesh)
+        self.dirty.clear()
+        self.built = True
+        self.version += 1
+
+    def read_mesh(self, mesh):
+        uuid = cmds.ls(mesh, uuid=True)[0]
+        colors = read_mesh_colors(mesh)
+        if colors is None:
+            self.mesh_colors.pop(uuid, None)
+            return
+
+        keys = vcm.color_keys(colors)
+        self.mesh_colors[uuid] = (keys, vcm.count_color_keys(keys))
+
+    def mark_dirty(self, meshes):
+        """指定メッシュ (パス) を次回の問い合わせ時に読み直す"""
+        self.dirty.update(cmds.ls(meshes, uuid=True) or [])
+
+    def update(self):
+        """未構築なら全体を構築し、構築済みなら汚れたメッシュだけを読み直す"""
+        if not self.built:
+            self.build()
+            return
+        if self.dirty:
+            self.version += 1
+        for uuid in self.dirty:
+            mesh = cmds.ls(uuid, long=True, noIntermediate=True)
+            if mesh:
+                self.read_mesh(mesh[0])
+            else:
+                # 削除されたメッシュ (または中間オブジェクト)
+                self.mesh_colors.pop(uuid, None)
+        self.dirty.clear()
+
+    def color_counts(self):
+        """{key: シーン全体の頂点数} を返す"""
+        self.update()
+        totals = {}
+        for _, counts in self.mesh_colors.values():
+            for key, count in counts.items():
+                totals[key] = totals.get(key, 0) + count
+        return totals
+
+    def match_keys(self, rgb, tolerance=0.0, metric="rgb"):
+        """rgb に一致する (許容値以内の) ユニークカラーのキーを返す"""
+        self.update()
+        if tolerance <= 0.0:
+            target = vcm.color_to_key(rgb)
+            found = any(target in counts for _, counts in self.mesh_colors.values())
+            return [target] if found else []
+
+        params = (self.version, tolerance, metric)
+        if self.grid_cache is None or self.grid_cache[0] != params:
+            keys = sorted(self.color_counts())
+            grid = None
+            if vcm.np is not None:
+                grid = vcm.ColorGrid(keys, tolerance, metric)
+            self.grid_cache = (params, keys, grid)
+        _, keys, grid = self.grid_cache
+        return vcm.match_color_keys(keys, rgb, tolerance, metric, grid=grid)
+
+    def meshes_with_color(self, rgb, tolerance=0.0, metric="rgb"):
+        """一致するカラーを持つメッシュの UUID リストを返す"""
+        matched = set(self.match_keys(rgb, tolerance, metric))
+        return [
+            uuid
+            for uuid, (_, counts) in self.mesh_colors.items()
+            if not matched.isdisjoint(counts)
+        ]
+
+    def vertices_with_color(self, rgb, tolerance=0.0, metric="rgb"):
+        """{uuid: 頂点インデックス配列} を返す"""
+        matched = self.match_keys(rgb, tolerance, metric)
+        matched_set = set(matched)
+        return {
+            uuid: vcm.find_keys_indices(keys, matched)
+            for uuid, (keys, counts) in self.mesh_colors.items()
+            if not matched_set.isdisjoint(counts)
+        }
+
 
 class VertexColorTool:
     """
@@ -9,9 +145,24 @@ class VertexColorTool:
     更新履歴:
     - [New] 選択モード（Object / Vertex）の切り替えラジオボタンを追加
     - [Update] 指定した頂点カラーを持つコンポーネント（頂点）のみを選択するロジックを実装
+    - [Perf] シーンカラーのインデックスを1回の走査で作成し、リスト更新と選択で共有
+    - [Perf] 頂点カラーの丸めと重複除去を VertexColorMath (NumPy) でベクトル化
+    - [New] メッシュの追加/削除/変更をコールバックで監視し、Scene Colors を自動更新
+    - [Perf] Vertexモードの選択を連続範囲 (vtx[a:b]) にまとめて実行
+    - [Perf] Scene Colors をページ表示に変更 (並び替え・フィルター付き)
+    - [Perf] 頂点カラーの読み込みを MFnMesh + NumPy に変更 (cmds はフォールバック)
+    - [Perf] 適用時に選択をフラット化せず、メッシュごとの頂点範囲で一括書き込み
+    - [New] 許容値 (RGB / Delta E) 付きの近似色選択を追加
+    - [New] Reduce Palette (k-means でシーンカラーを減色し一括で置き換え)
+    - [New] Replace Colors (色の一括置き換えと件数プレビュー)
     """
 
     def __init__(self):
+        # 補助モジュールが無い場合はウィンドウを作らずに終了
+        if vcm is None:
+            cmds.warning(MISSING_MODULES_MESSAGE)
+            return
+
         self.window_name = "vertexColorToolWindow"
         self.title = "Vertex Color Tool"
         self.size = (360, 720)
@@ -40,8 +191,22 @@ class VertexColorTool:
         ]
 
         self.widgets = {}
+        self.color_index = SceneColorIndex()
+        self.callback_ids = []
+        self.mesh_callbacks = {}
+        self.update_pending = False
+        self.list_keys = []
+        self.list_counts = {}
+        self.page = 0
+        # Reduce Palette のプレビュー結果 (index version, 元キー, 置き換え先キー)
+        self.reduction = None
+        # プレビュー前の Quick Palette (プレビュー中のみ保持)
+        self.palette_backup = None
+        # Replace Colors の対応表 [(元の色, 置き換え先の色), ...]
+        self.remap_pairs = []
         self.build_ui()
         self.refresh_scene_colors()
+        self.register_callbacks()
 
     def build_ui(self):
         if cmds.window(self.window_name, exists=True):
@@ -103,6 +268,12 @@ class VertexColorTool:
             height=40,
             bgc=(0.3, 0.5, 0.3),
         )
+        self.widgets["undoable"] = cmds.checkBox(
+            label="Undoable (off: faster MFnMesh write, no undo)",
+            value=True,
+            annotation="Undoable writes make one polyColorPerVertex call per "
+            "distinct color per mesh, which adds up for Reduce / Replace",
+        )
         cmds.setParent(main_col)
 
         # --- Palette ---
@@ -146,13 +317,166 @@ class VertexColorTool:
             p=main_col,
         )
 
-        # List Container
+        # Match Mode (許容値付きの近似色選択)
+        match_row = cmds.rowLayout(
+            numberOfColumns=2, adjustableColumn=1, columnWidth2=(180, 60), p=main_col
+        )
+        self.widgets["match_mode"] = cmds.optionMenu(label="Match:", p=match_row)
+        for label, _ in MATCH_MODES:
+            cmds.menuItem(label=label)
+        self.widgets["tolerance"] = cmds.floatField(
+            value=0.01,
+            minValue=0.0,
+            precision=3,
+            annotation="RGB: per-channel tolerance (0-1) / Delta E: Lab distance",
+            p=match_row,
+        )
+
+        # Sort & Filter
+        list_opt_row = cmds.rowLayout(
+            numberOfColumns=2, adjustableColumn=2, columnWidth2=(120, 100), p=main_col
+        )
+        self.widgets["sort_mode"] = cmds.optionMenu(
+            label="Sort:",
+            changeCommand=self.on_list_options_changed,
+            p=list_opt_row,
+        )
+        for mode in vcm.SORT_MODES:
+            cmds.menuItem(label=mode)
+        self.widgets["filter"] = cmds.textField(
+            placeholderText="Filter (e.g. 0.500 or #ff00)",
+            changeCommand=self.on_list_options_changed,
+            enterCommand=self.on_list_options_changed,
+            p=list_opt_row,
+        )
+
+        # List Container (表示ページ分の行だけを作成し、ページ切り替え時は中身を書き換える)
         cmds.frameLayout(labelVisible=False, p=main_col, borderStyle="etchedIn")
         self.widgets["scene_list_layout"] = cmds.columnLayout(
             adjustableColumn=True, rowSpacing=1
         )
+        self.widgets["empty_text"] = cmds.text(
+            label="No vertex colors found.",
+            parent=self.widgets["scene_list_layout"],
+            align="center",
+            h=20,
+        )
+        self.widgets["scene_rows"] = [
+            self.create_scene_color_row(i) for i in range(PAGE_SIZE)
+        ]
         cmds.setParent(main_col)
 
+        pager_row = cmds.rowLayout(
+            numberOfColumns=3,
+            adjustableColumn=2,
+            columnWidth3=(30, 100, 30),
+            p=main_col,
+        )
+        cmds.button(label="<", command=partial(self.change_page, -1), p=pager_row)
+        self.widgets["page_label"] = cmds.text(label="", align="center", p=pager_row)
+        cmds.button(label=">", command=partial(self.change_page, 1), p=pager_row)
+
+        # --- Reduce Palette ---
+        cmds.separator(h=15, style="in", p=main_col)
+        cmds.text(
+            label="Reduce Palette:", align="left", font="boldLabelFont", p=main_col
+        )
+        reduce_row = cmds.rowLayout(
+            numberOfColumns=4,
+            columnWidth4=(45, 50, 65, 60),
+            adjustableColumn=4,
+            p=main_col,
+        )
+        cmds.text(label="Colors:", p=reduce_row)
+        self.widgets["reduce_count"] = cmds.intField(
+            value=16, minValue=1, maxValue=256, p=reduce_row
+        )
+        cmds.text(label="Max Error:", p=reduce_row)
+        self.widgets["reduce_error"] = cmds.floatField(
+            value=0.0,
+            minValue=0.0,
+            precision=3,
+            annotation="0: use the color count / >0: grow the palette until "
+            "every color is within this RGB distance",
+            p=reduce_row,
+        )
+        reduce_btn_row = cmds.rowLayout(
+            numberOfColumns=3, adjustableColumn=True, p=main_col
+        )
+        cmds.button(
+            label="Preview (Quick Palette)",
+            command=self.preview_palette_reduction,
+            p=reduce_btn_row,
+        )
+        cmds.button(
+            label="Apply Reduction",
+            command=self.apply_palette_reduction,
+            bgc=(0.5, 0.35, 0.3),
+            annotation="Undoable: one polyColorPerVertex call per palette color "
+            "per mesh / off: one MFnMesh write per mesh",
+            p=reduce_btn_row,
+        )
+        cmds.button(
+            label="Revert Palette",
+            command=self.revert_palette_preview,
+            annotation="Restore the Quick Palette from before the preview",
+            p=reduce_btn_row,
+        )
+
+        # --- Replace Colors ---
+        cmds.separator(h=15, style="in", p=main_col)
+        cmds.text(
+            label="Replace Colors (uses Match / tolerance):",
+            align="left",
+            font="boldLabelFont",
+            p=main_col,
+        )
+        for name, label in (("remap_source", "From:"), ("remap_target", "To:")):
+            remap_row = cmds.rowLayout(
+                numberOfColumns=2,
+                adjustableColumn=1,
+                columnWidth2=(200, 70),
+                p=main_col,
+            )
+            self.widgets[name] = cmds.floatFieldGrp(
+                label=label,
+                numberOfFields=3,
+                precision=3,
+                columnWidth4=(40, 45, 45, 45),
+                p=remap_row,
+            )
+            cmds.button(
+                label="<- Current",
+                command=partial(self.copy_current_to_field, name),
+                p=remap_row,
+            )
+
+        self.widgets["remap_list"] = cmds.textScrollList(
+            allowMultiSelection=True, height=60, p=main_col
+        )
+        remap_list_row = cmds.rowLayout(
+            numberOfColumns=3, adjustableColumn=True, p=main_col
+        )
+        cmds.button(label="Add", command=self.add_remap_pair, p=remap_list_row)
+        cmds.button(label="Remove", command=self.remove_remap_pairs, p=remap_list_row)
+        cmds.button(label="Clear", command=self.clear_remap_pairs, p=remap_list_row)
+
+        remap_btn_row = cmds.rowLayout(
+            numberOfColumns=2, adjustableColumn=True, p=main_col
+        )
+        cmds.button(
+            label="Preview Count",
+            command=partial(self.run_color_remap, True),
+            p=remap_btn_row,
+        )
+        cmds.button(
+            label="Replace in Scene",
+            command=partial(self.run_color_remap, False),
+            bgc=(0.5, 0.35, 0.3),
+            p=remap_btn_row,
+        )
+        self.widgets["remap_status"] = cmds.text(label="", align="left", p=main_col)
+
         # --- Display Settings ---
         cmds.separator(h=15, style="in", p=main_col)
         cmds.text(
@@ -243,81 +567,142 @@ class VertexColorTool:
     # ==========================================
 
     def get_scene_colors(self):
-        scene_colors = set()
-        meshes = cmds.ls(type="mesh", noIntermediate=True, long=True) or []
+        return self.color_index.color_counts()
 
-        for mesh in meshes:
-            if cmds.polyEvaluate(mesh, vertex=True) == 0:
-                continue
-            if not cmds.polyColorSet(mesh, query=True, allColorSets=True):
-                continue
+    def refresh_scene_colors(self, *args):
+        # Refresh List ボタンからの呼び出し時はシーン全体を走査し直す
+        self.color_index.build()
+        self.update_scene_colors(verbose=True)
+
+    def update_scene_colors(self, verbose=False):
+        """
+        インデックスから一覧を作り直す (汚れたメッシュだけを読み直す)
+        verbose: 件数を Script Editor に出力する (Refresh List からのみ)
+        """
+        self.list_counts = self.get_scene_colors()
+
+        mode = cmds.optionMenu(self.widgets["sort_mode"], query=True, value=True)
+        keys = list(self.list_counts)
+        keys = vcm.sort_color_keys(keys, [self.list_counts[k] for k in keys], mode)
+
+        text = cmds.textField(self.widgets["filter"], query=True, text=True)
+        text = text.strip().lower()
+        if text:
+            keys = [k for k in keys if text in self.color_search_text(k)]
+
+        self.list_keys = keys
+        self.draw_page()
+
+        if verbose:
+            print(
+                f"Scene colors refreshed: {len(self.list_counts)} colors found"
+                f" ({len(keys)} shown)."
+            )
 
-            try:
-                colors = cmds.polyColorPerVertex(f"{mesh}.vtx[*]", query=True, rgb=True)
-                if not colors:
-                    continue
+    @staticmethod
+    def color_search_text(key):
+        r, g, b = vcm.key_to_color(key)
+        hex_value = "#{:02x}{:02x}{:02x}".format(
+            *(int(round(max(v, 0.0) * 255)) for v in (r, g, b))
+        )
+        return f"{r:.3f}, {g:.3f}, {b:.3f} {hex_value}"
 
-                for i in range(0, len(colors), 3):
-                    c = tuple(round(v, 3) for v in colors[i : i + 3])
-                    scene_colors.add(c)
-            except Exception:
-                pass
+    def draw_page(self):
+        """現在のページの行だけを書き換える (色数に関係なく一定コスト)"""
+        page_count = max(1, -(-len(self.list_keys) // PAGE_SIZE))
+        self.page = min(max(self.page, 0), page_count - 1)
+        offset = self.page * PAGE_SIZE
 
-        return sorted(list(scene_colors))
+        for i, row in enumerate(self.widgets["scene_rows"]):
+            if offset + i >= len(self.list_keys):
+                cmds.rowLayout(row["layout"], edit=True, manage=False)
+                continue
 
-    def refresh_scene_colors(self, *args):
-        unique_colors = self.get_scene_colors()
+            key = self.list_keys[offset + i]
+            rgb = vcm.key_to_color(key)
+            cmds.canvas(
+                row["swatch"], edit=True, rgbValue=[max(v, 0.0) for v in rgb]
+            )
+            cmds.text(
+                row["label"],
+                edit=True,
+                label=f" {rgb[0]:.2f}, {rgb[1]:.2f}, {rgb[2]:.2f}"
+                f"  ({self.list_counts[key]})",
+            )
+            cmds.rowLayout(row["layout"], edit=True, manage=True)
 
-        children = cmds.columnLayout(
-            self.widgets["scene_list_layout"], query=True, childArray=True
+        cmds.text(
+            self.widgets["empty_text"], edit=True, manage=not self.list_keys
+        )
+        cmds.text(
+            self.widgets["page_label"],
+            edit=True,
+            label=f"Page {self.page + 1} / {page_count}"
+            f"  ({len(self.list_keys)} colors)",
         )
-        if children:
-            for child in children:
-                cmds.deleteUI(child)
 
-        if not unique_colors:
-            cmds.text(
-                label="No vertex colors found.",
-                parent=self.widgets["scene_list_layout"],
-                align="center",
-                h=20,
-            )
-            return
+    def change_page(self, step, *args):
+        self.page += step
+        self.draw_page()
 
-        for rgb in unique_colors:
-            self.create_scene_color_row(rgb)
+    def on_list_options_changed(self, *args):
+        self.page = 0
+        self.update_scene_colors()
 
-        print(f"Scene colors refreshed: {len(unique_colors)} colors found.")
+    def row_color(self, row_index):
+        key = self.list_keys[self.page * PAGE_SIZE + row_index]
+        return vcm.key_to_color(key)
 
-    def create_scene_color_row(self, rgb):
+    def create_scene_color_row(self, row_index):
         row = cmds.rowLayout(
             numberOfColumns=3,
             columnWidth3=(40, 90, 60),
             adjustableColumn=2,
             parent=self.widgets["scene_list_layout"],
             bgc=(0.2, 0.2, 0.2),
+            manage=False,
         )
 
         # 1. Swatch
-        cmds.canvas(
+        swatch = cmds.canvas(
             width=20,
             height=20,
-            rgbValue=rgb,
-            pressCommand=partial(self.set_color, list(rgb)),
+            pressCommand=partial(self.on_row_pick, row_index),
             annotation="Click to pick this color",
         )
 
         # 2. Text
-        label_text = f" {rgb[0]:.2f}, {rgb[1]:.2f}, {rgb[2]:.2f}"
-        cmds.text(label=label_text, align="left")
+        label = cmds.text(label="", align="left")
 
         # 3. Select Button
         cmds.button(
             label="Select",
             height=20,
-            command=partial(self.select_by_color, rgb),
+            command=partial(self.on_row_select, row_index),
             annotation="Select objects or vertices with this color",
         )
+        cmds.setParent("..")
+
+        return {"layout": row, "swatch": swatch, "label": label}
+
+    def on_row_pick(self, row_index, *args):
+        self.set_color(list(self.row_color(row_index)))
+
+    def on_row_select(self, row_index, *args):
+        self.select_by_color(self.row_color(row_index))
+
+    def get_match_settings(self):
+        """(許容値, 距離の種類) を返す (Exact の場合は許容値 0)"""
+        mode_index = cmds.optionMenu(
+            self.widgets["match_mode"], query=True, select=True
+        )
+        metric = MATCH_MODES[mode_index - 1][1]
+        tolerance = 0.0
+        if metric:
+            tolerance = cmds.floatField(
+                self.widgets["tolerance"], query=True, value=True
+            )
+        return tolerance, metric
 
     def select_by_color(self, target_rgb, *args):
         """モードに応じてオブジェクトまたは頂点を選択"""
@@ -328,66 +713,53 @@ class VertexColorTool:
         )
         is_vertex_mode = mode_idx == 2
 
-        target_r = tuple(round(v, 3) for v in target_rgb)
+        tolerance, metric = self.get_match_settings()
 
         cmds.select(clear=True)
 
         selection_list = []
+        vertex_count = 0
 
-        meshes = cmds.ls(type="mesh", noIntermediate=True, long=True) or []
-
-        # プログレスバー表示（メッシュが多い場合用）
-        amount = len(meshes)
-
-        for mesh in meshes:
-            if not cmds.polyColorSet(mesh, query=True, allColorSets=True):
-                continue
+        # インデックスからマッチするメッシュと頂点を取得 (シーンの再走査なし)
+        # Objectモードでは頂点のマスクは作らない
+        if is_vertex_mode:
+            matches = self.color_index.vertices_with_color(
+                target_rgb, tolerance, metric
+            )
+        else:
+            matches = dict.fromkeys(
+                self.color_index.meshes_with_color(target_rgb, tolerance, metric)
+            )
 
-            # 頂点カラーを一括取得
-            colors = cmds.polyColorPerVertex(f"{mesh}.vtx[*]", query=True, rgb=True)
-            if not colors:
+        for uuid, matched_indices in matches.items():
+            mesh = cmds.ls(uuid, long=True)
+            if not mesh:
                 continue
-
-            # RGBリストを (r,g,b) タプルのリストに変換しつつ、ループ処理
-            # colorsはフラットなリスト [r,g,b, r,g,b, ...]
+            mesh = mesh[0]
 
             if is_vertex_mode:
                 # --- Vertex Mode Logic ---
-                # マッチする頂点インデックスを探す
-                matched_indices = []
-                for i in range(0, len(colors), 3):
-                    c = tuple(round(v, 3) for v in colors[i : i + 3])
-                    if c == target_r:
-                        # インデックスは (i / 3)
-                        matched_indices.append(i // 3)
-
-                # インデックスから選択文字列を生成 (例: pCube1.vtx[5])
-                if matched_indices:
-                    # 最適化: 連続するインデックスをスライス表記にできればベストだが、
-                    # ここではシンプルにリスト内包表記で文字列化
-                    for idx in matched_indices:
-                        selection_list.append(f"{mesh}.vtx[{idx}]")
+                # 連続するインデックスをスライス表記にまとめる (例: pCube1.vtx[0:99])
+                ranges = vcm.indices_to_ranges(matched_indices)
+                selection_list.extend(vcm.range_components(mesh, ranges))
+                vertex_count += len(matched_indices)
 
             else:
                 # --- Object Mode Logic ---
-                # 1つでもマッチすればそのオブジェクトを選択候補へ
-                found = False
-                for i in range(0, len(colors), 3):
-                    c = tuple(round(v, 3) for v in colors[i : i + 3])
-                    if c == target_r:
-                        found = True
-                        break
-
-                if found:
-                    transform = cmds.listRelatives(mesh, parent=True, fullPath=True)
-                    if transform:
-                        selection_list.append(transform[0])
+                transform = cmds.listRelatives(mesh, parent=True, fullPath=True)
+                if transform:
+                    selection_list.append(transform[0])
 
         # 選択実行
         if selection_list:
             cmds.select(selection_list)
-            mode_str = "Vertices" if is_vertex_mode else "Objects"
-            print(f"Selected {len(selection_list)} {mode_str} with color {target_rgb}")
+            if is_vertex_mode:
+                print(
+                    f"Selected {vertex_count} Vertices ({len(selection_list)} ranges) "
+                    f"with color {target_rgb}"
+                )
+            else:
+                print(f"Selected {len(selection_list)} Objects with color {target_rgb}")
 
             # Vertexモードの場合、自動的にコンポーネントモードに切り替えると親切
             if is_vertex_mode:
@@ -396,22 +768,310 @@ class VertexColorTool:
         else:
             cmds.warning(f"No items found with color {target_rgb}")
 
+    # ==========================================
+    # Palette Reduction & Remap
+    # ==========================================
+
+    def compute_palette_reduction(self):
+        """シーンの全カラーを k-means でまとめ、(元キー, 置き換え先キー, パレット) を返す"""
+        counts = self.color_index.color_counts()
+        counts.pop(vcm.UNSET_KEY, None)
+        if not counts:
+            return None
+
+        keys = sorted(counts)
+        palette, targets = vcm.reduce_palette(
+            keys,
+            [counts[k] for k in keys],
+            target_count=cmds.intField(
+                self.widgets["reduce_count"], query=True, value=True
+            ),
+            max_error=cmds.floatField(
+                self.widgets["reduce_error"], query=True, value=True
+            ),
+        )
+        self.reduction = (self.color_index.version, keys, targets.tolist())
+        return palette
+
+    def preview_palette_reduction(self, *args):
+        if vcm.np is None:
+            cmds.warning("Reduce Palette requires NumPy.")
+            return
+        palette = self.compute_palette_reduction()
+        if palette is None:
+            cmds.warning("No vertex colors found.")
+            return
+
+        # プレビューとして Quick Palette を置き換える (元のパレットは退避)
+        if self.palette_backup is None:
+            self.palette_backup = self.saved_palette
+        self.saved_palette = [list(vcm.key_to_color(k)) for k in palette.tolist()]
+        self.refresh_palette_ui()
+        print(
+            f"Palette preview: {len(self.reduction[1])} colors -> {len(palette)} colors"
+        )
+
+    def apply_palette_reduction(self, *args):
+        if vcm.np is None:
+            cmds.warning("Reduce Palette requires NumPy.")
+            return
+
+        self.color_index.update()
+        # プレビュー後にシーンが変わっていれば計算し直す
+        if self.reduction is None or self.reduction[0] != self.color_index.version:
+            self.preview_palette_reduction()
+        if self.reduction is None:
+            return
+
+        _, source_keys, target_keys = self.reduction
+        changed = self.remap_scene_colors(source_keys, target_keys)
+        self.reduction = None
+        self.revert_palette_preview()
+        print(f"Reduced palette: rewrote {self.describe_remap(changed)}")
+
+    def revert_palette_preview(self, *args):
+        """プレビューで置き換えた Quick Palette を元に戻す"""
+        if self.palette_backup is None:
+            return
+        self.saved_palette = self.palette_backup
+        self.palette_backup = None
+        self.refresh_palette_ui()
+
+    def remap_scene_colors(self, source_keys, target_keys, dry_run=False):
+        """
+        source_keys[i] の色を target_keys[i] に置き換える
+        変更があるメッシュだけをメッシュごとに一括で書き込み、
+        {mesh: (変更した頂点数, 書き込む色数)} を返す (dry_run では書き込まない)
+        Undoable では書き込む色ごとに polyColorPerVertex を1回呼ぶ
+        """
+        self.color_index.update()
+        sources = set(source_keys)
+
+        plan = {}
+        for uuid, (keys, counts) in self.color_index.mesh_colors.items():
+            if sources.isdisjoint(counts):
+                continue
+            indices, new_keys = vcm.remap_keys(keys, source_keys, target_keys)
+            mesh = cmds.ls(uuid, long=True)
+            if len(indices) and mesh:
+                plan[mesh[0]] = (indices, new_keys)
+
+        changed = {
+            mesh: (len(indices), len(vcm.count_color_keys(new_keys)))
+            for mesh, (indices, new_keys) in plan.items()
+        }
+        if dry_run or not plan:
+            return changed
+
+        undoable = self.is_undoable()
+        cmds.undoInfo(openChunk=True, chunkName="remapVertexColors")
+        try:
+            for mesh, (indices, new_keys) in plan.items():
+                write_vertex_color_keys(mesh, indices, new_keys, undoable)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        self.color_index.mark_dirty(list(plan))
+        self.update_scene_colors()
+        return changed
+
+    def describe_remap(self, changed):
+        """remap_scene_colors の結果の要約 (頂点数, メッシュ数, 書き込み回数)"""
+        vertices = sum(count for count, _ in changed.values())
+        if self.is_undoable():
+            calls = sum(colors for _, colors in changed.values())
+            writes = f"{calls} undoable polyColorPerVertex calls"
+        else:
+            writes = f"{len(changed)} MFnMesh writes"
+        return f"{vertices} vertices on {len(changed)} meshes, {writes}"
+
+    def copy_current_to_field(self, name, *args):
+        rgb = self.current_color
+        cmds.floatFieldGrp(
+            self.widgets[name], edit=True, value1=rgb[0], value2=rgb[1], value3=rgb[2]
+        )
+
+    def read_color_field(self, name):
+        return cmds.floatFieldGrp(self.widgets[name], query=True, value=True)[:3]
+
+    def refresh_remap_list(self):
+        cmds.textScrollList(self.widgets["remap_list"], edit=True, removeAll=True)
+        for source, target in self.remap_pairs:
+            cmds.textScrollList(
+                self.widgets["remap_list"],
+                edit=True,
+                append=f"{source[0]:.3f}, {source[1]:.3f}, {source[2]:.3f}"
+                f"  ->  {target[0]:.3f}, {target[1]:.3f}, {target[2]:.3f}",
+            )
+
+    def add_remap_pair(self, *args):
+        pair = (
+            self.read_color_field("remap_source"),
+            self.read_color_field("remap_target"),
+        )
+        self.remap_pairs.append(pair)
+        self.refresh_remap_list()
+
+    def remove_remap_pairs(self, *args):
+        selected = cmds.textScrollList(
+            self.widgets["remap_list"], query=True, selectIndexedItem=True
+        )
+        for index in sorted(selected or [], reverse=True):
+            del self.remap_pairs[index - 1]
+        self.refresh_remap_list()
+
+    def clear_remap_pairs(self, *args):
+        self.remap_pairs = []
+        self.refresh_remap_list()
+
+    def build_remap_keys(self, pairs):
+        """
+        対応表を (元キー, 置き換え先キー) に展開する
+        許容値の範囲に入るシーンカラーを全て元キーに含め、重複時は先の対応を優先
+        """
+        tolerance, metric = self.get_match_settings()
+
+        mapping = {}
+        for source, target in pairs:
+            target_key = vcm.color_to_key(target)
+            for key in self.color_index.match_keys(source, tolerance, metric):
+                mapping.setdefault(key, target_key)
+        return list(mapping), list(mapping.values())
+
+    def run_color_remap(self, dry_run, *args):
+        """対応表 (空の場合は From / To の入力) で色を一括置き換え"""
+        pairs = self.remap_pairs or [
+            (
+                self.read_color_field("remap_source"),
+                self.read_color_field("remap_target"),
+            )
+        ]
+        source_keys, target_keys = self.build_remap_keys(pairs)
+        changed = self.remap_scene_colors(source_keys, target_keys, dry_run=dry_run)
+
+        verb = "Would replace" if dry_run else "Replaced"
+        message = (
+            f"{verb} {self.describe_remap(changed)} "
+            f"({len(source_keys)} source colors)"
+        )
+        cmds.text(self.widgets["remap_status"], edit=True, label=message)
+        print(message)
+
+    # ==========================================
+    # Scene Callbacks
+    # ==========================================
+
+    def register_callbacks(self):
+        """メッシュの追加/削除/変更を監視し、変更されたメッシュだけを dirty にする"""
+        if om is None:
+            return
+
+        self.callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(self.on_mesh_added, "mesh"),
+            om.MDGMessage.addNodeRemovedCallback(self.on_mesh_removed, "mesh"),
+        ]
+        it = om.MItDependencyNodes(om.MFn.kMesh)
+        while not it.isDone():
+            self.watch_mesh(it.thisNode())
+            it.next()
+
+        # ウィンドウを閉じたらコールバックを全て解除
+        cmds.scriptJob(uiDeleted=[self.window, self.remove_callbacks])
+        # 再生中は更新を止め、再生が終わったら溜まった dirty をまとめて反映
+        cmds.scriptJob(
+            conditionFalse=["playingBack", self.on_playback_stopped],
+            parent=self.window,
+        )
+
+    def watch_mesh(self, node):
+        uuid = om.MFnDependencyNode(node).uuid().asString()
+        if uuid not in self.mesh_callbacks:
+            self.mesh_callbacks[uuid] = [
+                om.MNodeMessage.addNodeDirtyPlugCallback(
+                    node, self.on_mesh_dirty, uuid
+                ),
+                om.MNodeMessage.addAttributeChangedCallback(
+                    node, self.on_mesh_attribute_changed, uuid
+                ),
+            ]
+        return uuid
+
+    def remove_callbacks(self):
+        if om is None:
+            return
+        ids = list(self.callback_ids)
+        for mesh_ids in self.mesh_callbacks.values():
+            ids.extend(mesh_ids)
+        if ids:
+            om.MMessage.removeCallbacks(ids)
+        self.callback_ids = []
+        self.mesh_callbacks = {}
+
+    def on_mesh_added(self, node, *args):
+        self.mark_mesh_dirty(self.watch_mesh(node))
+
+    def on_mesh_removed(self, node, *args):
+        uuid = om.MFnDependencyNode(node).uuid().asString()
+        mesh_ids = self.mesh_callbacks.pop(uuid, None)
+        if mesh_ids:
+            om.MMessage.removeCallbacks(mesh_ids)
+        self.mark_mesh_dirty(uuid)
+
+    def on_mesh_dirty(self, node, plug, uuid):
+        if plug.partialName(useLongNames=True).startswith(COLOR_PLUG_NAMES):
+            self.mark_mesh_dirty(uuid)
+
+    def on_mesh_attribute_changed(self, msg, plug, other_plug, uuid):
+        if plug.partialName(useLongNames=True).startswith(COLOR_PLUG_NAMES):
+            self.mark_mesh_dirty(uuid)
+
+    def mark_mesh_dirty(self, uuid):
+        """メッシュを dirty にし、アイドル時に一覧を1回だけ更新する"""
+        self.color_index.dirty.add(uuid)
+        if not self.update_pending:
+            self.update_pending = True
+            cmds.evalDeferred(self.on_deferred_update, lowestPriority=True)
+
+    def on_deferred_update(self):
+        self.update_pending = False
+        # 再生中 (スキンメッシュなどで inMesh が毎フレーム変わる) は読み直さない
+        if cmds.play(query=True, state=True):
+            return
+        if cmds.window(self.window_name, exists=True):
+            self.update_scene_colors()
+
+    def on_playback_stopped(self):
+        if self.color_index.dirty and not self.update_pending:
+            self.update_pending = True
+            cmds.evalDeferred(self.on_deferred_update, lowestPriority=True)
+
     # ==========================================
     # Application & Display
     # ==========================================
 
+    def is_undoable(self):
+        return cmds.checkBox(self.widgets["undoable"], query=True, value=True)
+
     def apply_color(self, *args):
-        selection = cmds.ls(selection=True, flatten=True, long=True)
-        if not selection:
+        if not cmds.ls(selection=True):
             cmds.warning("Please select objects or components.")
             return
+
+        undoable = self.is_undoable()
+        targets = []
+        cmds.undoInfo(openChunk=True, chunkName="applyVertexColor")
         try:
-            cmds.polyColorPerVertex(
-                selection, rgb=self.current_color, colorDisplayOption=True
-            )
-            print(f"Applied color {self.current_color}")
+            # 選択をフラット化せず、面はそのまま、それ以外は頂点範囲で書き込む
+            targets = apply_selection_color(self.current_color, undoable)
+            print(f"Applied color {self.current_color} to {len(targets)} meshes")
         except Exception as e:
             cmds.warning(f"Error applying color: {e}")
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        # 色を変更したメッシュだけを読み直して一覧を更新
+        self.color_index.mark_dirty(list(targets))
+        self.update_scene_colors()
 
     def toggle_selection_display(self, *args):
         selection = cmds.ls(selection=True, long=True)
@@ -452,4 +1112,5 @@ class VertexColorTool:
 
 
 # 実行
-VertexColorTool()
+if __name__ == "__main__":
+    VertexColorTool()
@@ -1,47 +1,153 @@
 # -*- coding: utf-8 -*-
 
 import maya.cmds as cmds
+import json
 import re
 
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    om = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+PNT_AXES = ("pntx", "pnty", "pntz")
+
+# Unflattened component strings, e.g. 'pCube1.vtx[0:199999]' or 'pCube1.f[12]'
+COMPONENT_PATTERN = re.compile(
+    r"^(?P<node>.+)\.(?P<kind>vtx|e|f|map)\[(?P<start>\d+)(?::(?P<stop>\d+))?\]$"
+)
+
+
+def compress_indices(indices):
+    """
+    Merges vertex indices into sorted, inclusive (start, stop) ranges.
+    e.g., [0, 1, 2, 5, 7, 8] -> [(0, 2), (5, 5), (7, 8)]
+    Uses NumPy when available.
+    """
+    if np is None:
+        ranges = []
+        for index in sorted(set(indices)):
+            if ranges and index == ranges[-1][1] + 1:
+                ranges[-1][1] = index
+            else:
+                ranges.append([index, index])
+        return [(start, stop) for start, stop in ranges]
+
+    indices = np.unique(np.asarray(indices, dtype=np.int64))
+    if indices.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(indices) != 1)
+    starts = np.concatenate((indices[:1], indices[breaks + 1]))
+    stops = np.concatenate((indices[breaks], indices[-1:]))
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def merge_ranges(ranges):
+    """
+    Sorts inclusive (start, stop) ranges and merges overlapping or adjacent ones.
+    e.g., [(5, 9), (0, 3), (4, 4)] -> [(0, 9)]
+    """
+    merged = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    return [(start, stop) for start, stop in merged]
+
+
+def count_range_indices(ranges):
+    """
+    Returns the number of indices covered by inclusive (start, stop) ranges.
+    """
+    return sum(stop - start + 1 for start, stop in ranges)
+
+
+def resolve_mesh_shape(node):
+    """
+    Returns the mesh shape for a transform or shape node, or None.
+    """
+    if cmds.nodeType(node) == "mesh":
+        return node
+    shapes = cmds.listRelatives(node, shapes=True, path=True, type="mesh") or []
+    return shapes[0] if shapes else None
+
+
+def parse_vertex_selection(components=None):
+    """
+    Resolves component strings into merged vertex ranges per mesh shape.
+    Works on the unflattened selection, so 'pCube1.vtx[0:199999]' stays a
+    single (0, 199999) range. Edges, faces and UVs are converted to vertices
+    with one polyListComponentConversion call.
+    Returns a dict such as {'pCubeShape1': [(0, 199999)]}.
+    """
+    if components is None:
+        components = cmds.ls(selection=True) or []
+
+    vertex_components = []
+    to_convert = []
+    for component in components:
+        match = COMPONENT_PATTERN.match(component)
+        if not match:
+            continue
+        if match.group("kind") == "vtx":
+            vertex_components.append(component)
+        else:
+            to_convert.append(component)
+
+    if to_convert:
+        vertex_components += (
+            cmds.polyListComponentConversion(to_convert, toVertex=True) or []
+        )
+
+    ranges_by_shape = {}
+    shape_cache = {}
+    for component in vertex_components:
+        match = COMPONENT_PATTERN.match(component)
+        if not match or match.group("kind") != "vtx":
+            continue
+
+        node = match.group("node")
+        if node not in shape_cache:
+            shape_cache[node] = resolve_mesh_shape(node)
+        shape_name = shape_cache[node]
+        if not shape_name:
+            continue
+
+        start = int(match.group("start"))
+        stop = int(match.group("stop") or start)
+        ranges_by_shape.setdefault(shape_name, []).append((start, stop))
+
+    return {shape: merge_ranges(ranges) for shape, ranges in ranges_by_shape.items()}
+
 
 def lock_selected_vertices(*args):
     """
     Locks the transformation of the currently selected vertices.
+    Edge, face and UV selections are converted to their vertices.
     """
-    # Get the selected components as a flattened list
-    # e.g., ['pCube1.vtx[0]', 'pCube1.vtx[1]', ... ]
-    selected_vertices = cmds.ls(selection=True, flatten=True)
+    ranges_by_shape = parse_vertex_selection()
 
-    if not selected_vertices:
+    if not ranges_by_shape:
         cmds.warning("No vertices are selected.")
         return
 
     locked_count = 0
-    for vtx_component in selected_vertices:
-        # Check if the selected item is a vertex (.vtx)
-        if ".vtx[" in vtx_component:
-            # Use regex to extract the object name and vertex index
-            # e.g., 'pCube1.vtx[123]' -> obj='pCube1', index='123'
-            match = re.search(r"(.+)\.vtx\[(\d+)\]", vtx_component)
-            if match:
-                object_name = match.group(1)
-                vertex_index = match.group(2)
-
-                # Get the shape node from the object name
-                shapes = cmds.listRelatives(object_name, shapes=True, path=True)
-                if not shapes:
-                    continue
-
-                shape_name = shapes[0]
-
-                # Lock the position attributes for each axis
-                try:
-                    cmds.setAttr(f"{shape_name}.pnts[{vertex_index}].pntx", lock=True)
-                    cmds.setAttr(f"{shape_name}.pnts[{vertex_index}].pnty", lock=True)
-                    cmds.setAttr(f"{shape_name}.pnts[{vertex_index}].pntz", lock=True)
-                    locked_count += 1
-                except Exception as e:
-                    print(f"Failed to lock vertex {vtx_component}: {e}")
+    cmds.undoInfo(openChunk=True, chunkName="lockSelectedVertices")
+    try:
+        for shape_name, ranges in ranges_by_shape.items():
+            try:
+                set_pnts_lock_ranges(shape_name, ranges, True)
+                locked_count += count_range_indices(ranges)
+            except Exception as e:
+                print(f"Failed to lock vertices on {shape_name}: {e}")
+    finally:
+        cmds.undoInfo(closeChunk=True)
 
     if locked_count > 0:
         print(f"Success: Locked {locked_count} vertices.")
@@ -49,9 +155,118 @@ def lock_selected_vertices(*args):
         cmds.warning("No valid vertices found to lock.")
 
 
-def unlock_all_vertices_on_object(*args):
+def get_locked_vertex_indices(shape_name):
+    """
+    Returns the sorted indices of the vertices that have any locked point axis.
+    A single listAttr call returns only the locked plugs, e.g. 'pnts[12].pntx',
+    so the cost depends on the number of locked points, not on the mesh size.
+    """
+    locked_plugs = cmds.listAttr(f"{shape_name}.pnts", multi=True, locked=True) or []
+    indices = set()
+    for plug in locked_plugs:
+        # 'pnts[12].pntx' -> '12'
+        head, _, tail = plug.partition("[")
+        index = tail.partition("]")[0]
+        if head == "pnts" and index.isdigit():
+            indices.add(int(index))
+    return sorted(indices)
+
+
+class CmdsLockBackend:
+    """
+    Lock queries and edits through maya.cmds attribute strings.
+    Edits are recorded in the undo queue.
+    """
+
+    name = "cmds"
+
+    def get_locked_ranges(self, shape_name):
+        return compress_indices(get_locked_vertex_indices(shape_name))
+
+    def set_locked_ranges(self, shape_name, ranges, lock):
+        # One setAttr call per axis and range instead of per vertex
+        for start, stop in ranges:
+            for axis in PNT_AXES:
+                cmds.setAttr(f"{shape_name}.pnts[{start}:{stop}].{axis}", lock=lock)
+
+
+class ApiLockBackend(CmdsLockBackend):
+    """
+    Lock queries through OpenMaya API 2.0.
+    The shape is resolved once into its 'pnts' MPlug and the existing
+    elements are read directly, without building or parsing attribute
+    strings, so a query costs one step per 'pnts' element.
+    The API has no range lock edit, so edits use the bulk, undoable range
+    setAttr calls of the cmds backend.
+    """
+
+    name = "api"
+
+    def get_pnts_plug(self, shape_name):
+        selection = om.MSelectionList()
+        selection.add(shape_name)
+        node = selection.getDependNode(0)
+        return om.MFnDependencyNode(node).findPlug("pnts", False)
+
+    def get_locked_ranges(self, shape_name):
+        plug = self.get_pnts_plug(shape_name)
+        indices = []
+        # Only existing elements can carry a lock, so walk the physical array
+        for i in range(plug.numElements()):
+            element = plug.elementByPhysicalIndex(i)
+            for axis in range(len(PNT_AXES)):
+                if element.child(axis).isLocked:
+                    indices.append(element.logicalIndex())
+                    break
+        return compress_indices(indices)
+
+
+LOCK_BACKENDS = {"cmds": CmdsLockBackend()}
+if om is not None:
+    LOCK_BACKENDS["api"] = ApiLockBackend()
+
+# Automatic queries walk the 'pnts' plug through the API only up to this
+# many existing elements. Untweaked meshes have few elements; once a mesh
+# is tweaked the array holds every vertex, and listAttr(locked=True), which
+# returns only the locked plugs, is cheaper.
+API_QUERY_MAX_ELEMENTS = 5000
+
+
+def get_lock_backend(name=None, shape_name=None):
+    """
+    Returns the lock backend by name ('cmds' or 'api').
+    Without a name, a query on shape_name uses the API backend when OpenMaya
+    is available and the shape has at most API_QUERY_MAX_ELEMENTS 'pnts'
+    elements, and the cmds backend otherwise. Both edit through cmds.
+    """
+    if name is None:
+        name = "cmds"
+        if shape_name is not None and "api" in LOCK_BACKENDS:
+            plug = LOCK_BACKENDS["api"].get_pnts_plug(shape_name)
+            if plug.numElements() <= API_QUERY_MAX_ELEMENTS:
+                name = "api"
+    return LOCK_BACKENDS[name]
+
+
+def get_locked_vertex_ranges(shape_name, backend=None):
+    """
+    Returns the locked vertices of a shape as compressed (start, stop) ranges.
+    """
+    return get_lock_backend(backend, shape_name).get_locked_ranges(shape_name)
+
+
+def set_pnts_lock_ranges(shape_name, ranges, lock, backend=None):
+    """
+    Locks or unlocks the point attributes of a shape range by range.
+    """
+    get_lock_backend(backend).set_locked_ranges(shape_name, ranges, lock)
+
+
+def unlock_all_vertices_on_object(*args, sparse=True):
     """
     Unlocks all vertices on the selected object(s).
+    With sparse=True only the currently locked points are unlocked, as
+    compressed ranges. Otherwise the whole 'pnts' array is unlocked at once.
     """
     # Get the selected objects (transform nodes)
     selected_objects = cmds.ls(selection=True, objectsOnly=True)
@@ -61,40 +276,297 @@ def unlock_all_vertices_on_object(*args):
         return
 
     unlocked_obj_count = 0
-    for obj in selected_objects:
-        # Get the shape node from the object
-        shapes = cmds.listRelatives(obj, shapes=True, path=True)
-        if not shapes:
-            print(f"Skipping {obj}: No polygon shape found.")
-            continue
-
-        shape_name = shapes[0]
+    cmds.undoInfo(openChunk=True, chunkName="unlockAllVertices")
+    try:
+        for obj in selected_objects:
+            # Get the shape node from the object
+            shape_name = resolve_mesh_shape(obj)
+            if not shape_name:
+                print(f"Skipping {obj}: No polygon shape found.")
+                continue
 
-        # Get the total number of vertices for the object
-        try:
-            num_vertices = cmds.polyEvaluate(shape_name, vertex=True)
-        except:
-            # Skip if it's not a polygon mesh
-            print(f"Skipping {obj}: Not a polygon mesh.")
-            continue
+            if sparse:
+                ranges = get_locked_vertex_ranges(shape_name)
+            else:
+                num_vertices = cmds.polyEvaluate(shape_name, vertex=True)
+                ranges = [(0, num_vertices - 1)] if num_vertices else []
 
-        # Loop through all vertices and unlock them
-        for i in range(num_vertices):
             try:
-                cmds.setAttr(f"{shape_name}.pnts[{i}].pntx", lock=False)
-                cmds.setAttr(f"{shape_name}.pnts[{i}].pnty", lock=False)
-                cmds.setAttr(f"{shape_name}.pnts[{i}].pntz", lock=False)
-            except Exception as e:
-                # Ignore errors, e.g., if already unlocked
-                pass
+                set_pnts_lock_ranges(shape_name, ranges, False)
+            except RuntimeError as e:
+                print(f"Skipping {obj}: Failed to unlock vertices. ({e})")
+                continue
 
-        print(f"Success: Unlocked all vertices on {obj}.")
-        unlocked_obj_count += 1
+            print(f"Success: Unlocked all vertices on {obj}.")
+            unlocked_obj_count += 1
+    finally:
+        cmds.undoInfo(closeChunk=True)
 
     if unlocked_obj_count == 0:
         cmds.warning("No valid objects found to unlock.")
 
 
+def get_world_positions(shape_name):
+    """
+    Returns the world-space vertex positions of a shape as an (N, 3) array,
+    fetched with a single xform call.
+    """
+    positions = cmds.xform(
+        f"{shape_name}.vtx[*]", query=True, worldSpace=True, translation=True
+    )
+    return np.asarray(positions or [], dtype=np.float64).reshape(-1, 3)
+
+
+def box_region_mask(positions, box_min, box_max):
+    """
+    Returns a boolean mask of the positions inside an axis-aligned box.
+    """
+    return np.all(
+        (positions >= np.asarray(box_min)) & (positions <= np.asarray(box_max)),
+        axis=1,
+    )
+
+
+def sphere_region_mask(positions, center, radius):
+    """
+    Returns a boolean mask of the positions inside a sphere.
+    """
+    offsets = positions - np.asarray(center)
+    return np.einsum("ij,ij->i", offsets, offsets) <= radius * radius
+
+
+def mask_to_ranges(mask):
+    """
+    Converts a boolean vertex mask into inclusive (start, stop) ranges.
+    """
+    return compress_indices(np.flatnonzero(mask))
+
+
+def lock_vertices_in_region(objects, region_mask):
+    """
+    Locks every vertex of the given objects for which region_mask is True.
+    region_mask receives the (N, 3) world positions of one shape, e.g.
+    lambda p: sphere_region_mask(p, (0, 0, 0), 5.0)
+    Returns the number of locked vertices.
+    """
+    if np is None:
+        cmds.warning("NumPy is required for region locking.")
+        return 0
+
+    locked_count = 0
+    cmds.undoInfo(openChunk=True, chunkName="lockVerticesInRegion")
+    try:
+        for obj in objects:
+            shape_name = resolve_mesh_shape(obj)
+            if not shape_name:
+                continue
+            ranges = mask_to_ranges(region_mask(get_world_positions(shape_name)))
+            if ranges:
+                set_pnts_lock_ranges(shape_name, ranges, True)
+                locked_count += count_range_indices(ranges)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return locked_count
+
+
+def lock_vertices_in_box(objects, box_min, box_max):
+    """
+    Locks the vertices of the given objects inside an axis-aligned box.
+    """
+    return lock_vertices_in_region(
+        objects, lambda positions: box_region_mask(positions, box_min, box_max)
+    )
+
+
+def lock_vertices_in_sphere(objects, center, radius):
+    """
+    Locks the vertices of the given objects inside a sphere.
+    """
+    return lock_vertices_in_region(
+        objects, lambda positions: sphere_region_mask(positions, center, radius)
+    )
+
+
+def lock_vertices_inside_proxy(*args):
+    """
+    Locks the vertices inside the bounding box of the last selected object.
+    The other selected objects are the targets; with only the proxy selected,
+    every mesh in the scene is tested.
+    """
+    selected_objects = cmds.ls(selection=True, objectsOnly=True, long=True)
+    if not selected_objects:
+        cmds.warning("Select the target objects and then the proxy mesh.")
+        return
+
+    proxy = selected_objects[-1]
+    targets = selected_objects[:-1]
+    if not targets:
+        # Compare by UUID: resolve_mesh_shape returns a partial path
+        proxy_shape = resolve_mesh_shape(proxy)
+        proxy_uuid = cmds.ls(proxy_shape, uuid=True)[0] if proxy_shape else None
+        targets = [
+            m
+            for m in cmds.ls(type="mesh", noIntermediate=True, long=True) or []
+            if cmds.ls(m, uuid=True)[0] != proxy_uuid
+        ]
+
+    bounds = cmds.exactWorldBoundingBox(proxy)
+    locked_count = lock_vertices_in_box(targets, bounds[:3], bounds[3:])
+
+    if locked_count > 0:
+        print(f"Success: Locked {locked_count} vertices inside {proxy}.")
+    else:
+        cmds.warning(f"No vertices found inside {proxy}.")
+
+
+def get_scene_lock_report():
+    """
+    Returns (shape, locked range count, locked vertex count) for every mesh
+    in the scene that has locked vertices.
+    """
+    report = []
+    for shape_name in cmds.ls(type="mesh", noIntermediate=True, long=True) or []:
+        ranges = get_locked_vertex_ranges(shape_name)
+        if ranges:
+            report.append((shape_name, len(ranges), count_range_indices(ranges)))
+    return report
+
+
+def print_scene_lock_report(*args):
+    """
+    Prints the locked shapes of the scene with their range and vertex counts.
+    """
+    report = get_scene_lock_report()
+    if not report:
+        print("No locked vertices found in the scene.")
+        return
+
+    for shape_name, range_count, vertex_count in report:
+        print(f"{shape_name}: {vertex_count} vertices in {range_count} ranges")
+    print(f"Found locked vertices on {len(report)} shapes.")
+
+
+def save_lock_snapshot(file_path, shapes=None):
+    """
+    Writes the locked vertices of the given shapes to a JSON-lines file.
+    Each line holds one shape with its vertex count and run-length ranges:
+    {"shape": "|pCube1|pCubeShape1", "vertices": 8, "ranges": [[0, 3]]}
+    Without shapes, every mesh in the scene that has locked vertices is saved.
+    Returns the number of shapes written.
+    """
+    if shapes is None:
+        shapes = cmds.ls(type="mesh", noIntermediate=True, long=True) or []
+        skip_unlocked = True
+    else:
+        skip_unlocked = False
+
+    written = 0
+    with open(file_path, "w") as f:
+        for shape_name in shapes:
+            ranges = get_locked_vertex_ranges(shape_name)
+            if skip_unlocked and not ranges:
+                continue
+            record = {
+                "shape": cmds.ls(shape_name, long=True)[0],
+                "vertices": cmds.polyEvaluate(shape_name, vertex=True),
+                "ranges": [[start, stop] for start, stop in ranges],
+            }
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            written += 1
+    return written
+
+
+def _find_snapshot_shape(shape_name):
+    """
+    Finds the scene shape for a snapshot record. Falls back to the short name
+    when the DAG path changed, e.g. after a re-import into another group.
+    """
+    if cmds.objExists(shape_name):
+        return shape_name
+    short_name = shape_name.rsplit("|", 1)[-1]
+    matches = cmds.ls(short_name, type="mesh", long=True) or []
+    if len(matches) == 1:
+        return matches[0]
+    return None
+
+
+def load_lock_snapshot(file_path, replace=True):
+    """
+    Reapplies a snapshot written by save_lock_snapshot.
+    With replace=True, points locked in the scene but not in the snapshot are
+    unlocked first. Shapes whose vertex count changed are skipped.
+    Returns the number of shapes restored.
+    """
+    restored = 0
+    cmds.undoInfo(openChunk=True, chunkName="loadLockSnapshot")
+    try:
+        with open(file_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                shape_name = _find_snapshot_shape(record["shape"])
+                if not shape_name:
+                    print(f"Skipping {record['shape']}: Shape not found.")
+                    continue
+
+                num_vertices = cmds.polyEvaluate(shape_name, vertex=True)
+                if num_vertices != record["vertices"]:
+                    print(
+                        f"Skipping {shape_name}: Vertex count changed "
+                        f"({record['vertices']} -> {num_vertices})."
+                    )
+                    continue
+
+                if replace:
+                    set_pnts_lock_ranges(
+                        shape_name, get_locked_vertex_ranges(shape_name), False
+                    )
+                set_pnts_lock_ranges(
+                    shape_name, [tuple(r) for r in record["ranges"]], True
+                )
+                restored += 1
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return restored
+
+
+def save_lock_snapshot_dialog(*args):
+    """
+    Saves the locked vertices of the selected objects (or the whole scene).
+    """
+    file_paths = cmds.fileDialog2(
+        fileFilter="Lock Snapshot (*.jsonl)", dialogStyle=2, fileMode=0
+    )
+    if not file_paths:
+        return
+
+    selected_objects = cmds.ls(selection=True, objectsOnly=True)
+    shapes = None
+    if selected_objects:
+        shapes = [s for s in map(resolve_mesh_shape, selected_objects) if s]
+
+    written = save_lock_snapshot(file_paths[0], shapes)
+    print(f"Success: Saved lock state of {written} shapes to {file_paths[0]}.")
+
+
+def load_lock_snapshot_dialog(*args):
+    """
+    Restores a lock snapshot chosen in a file dialog.
+    """
+    file_paths = cmds.fileDialog2(
+        fileFilter="Lock Snapshot (*.jsonl)", dialogStyle=2, fileMode=1
+    )
+    if not file_paths:
+        return
+
+    restored = load_lock_snapshot(file_paths[0])
+    if restored > 0:
+        print(f"Success: Restored lock state of {restored} shapes.")
+    else:
+        cmds.warning("No shapes in the snapshot matched the scene.")
+
+
 def create_vertex_locker_ui():
     """
     Creates the UI window for the tool.
@@ -107,7 +579,7 @@ def create_vertex_locker_ui():
     cmds.window(
         window_id,
         title="Vertex Locker",
-        widthHeight=(70, 140),
+        widthHeight=(70, 260),
         mxb=False,
         mnb=False,
         tlb=True,
@@ -128,6 +600,33 @@ def create_vertex_locker_ui():
         backgroundColor=(0.4, 0.8, 0.4),
     )
 
+    cmds.button(
+        label="Lock Inside Proxy (Last Selected)",
+        command=lock_vertices_inside_proxy,
+        height=25,
+        backgroundColor=(0.8, 0.6, 0.4),
+    )
+
+    cmds.separator(height=6, style="in")
+
+    cmds.button(
+        label="Report Locked Vertices",
+        command=print_scene_lock_report,
+        height=25,
+    )
+
+    cmds.button(
+        label="Save Lock Snapshot...",
+        command=save_lock_snapshot_dialog,
+        height=25,
+    )
+
+    cmds.button(
+        label="Load Lock Snapshot...",
+        command=load_lock_snapshot_dialog,
+        height=25,
+    )
+
     cmds.showWindow(window_id)
 
 
@@ -0,0 +1,80 @@
+"""
+Compares the per-vertex tuple loop the color tools used to run with the
+packed-key path of VertexColorMath (NumPy and pure-Python fallback), on a
+synthetic 1M-vertex color buffer. Runs without Maya.
+
+Usage: python benchmarks/bench_color_keys.py [num_vertices]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import VertexColorMath  # noqa: E402
+
+
+def make_colors(num_vertices, palette_size=64, seed=0):
+    """Flat [r, g, b, ...] buffer drawing every vertex from a small palette."""
+    rng = random.Random(seed)
+    palette = [[rng.random() for _ in range(3)] for _ in range(palette_size)]
+    colors = []
+    for _ in range(num_vertices):
+        colors.extend(rng.choice(palette))
+    return colors
+
+
+def tuple_loop(colors, target):
+    """The original extraction and matching loops."""
+    unique = set()
+    matched = []
+    target_r = tuple(round(v, 3) for v in target)
+    for i in range(0, len(colors), 3):
+        c = tuple(round(v, 3) for v in colors[i : i + 3])
+        unique.add(c)
+        if c == target_r:
+            matched.append(i // 3)
+    return len(unique), len(matched)
+
+
+def key_path(colors, target):
+    keys = VertexColorMath.color_keys(colors)
+    unique = VertexColorMath.count_color_keys(keys)
+    matched = VertexColorMath.find_key_indices(
+        keys, VertexColorMath.color_to_key(target)
+    )
+    return len(unique), len(matched)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run(num_vertices=1000000):
+    colors = make_colors(num_vertices)
+    target = colors[:3]
+    print(f"{num_vertices} vertices")
+
+    baseline_time, expected = timed(tuple_loop, colors, target)
+    print(f"{'tuple loop':<16}{baseline_time:>9.3f}s")
+
+    numpy_module = VertexColorMath.np
+    for name, module in (("numpy", numpy_module), ("python fallback", None)):
+        if name == "numpy" and module is None:
+            print(f"{name:<16}{'n/a':>10}")
+            continue
+        VertexColorMath.np = module
+        try:
+            elapsed, result = timed(key_path, colors, target)
+        finally:
+            VertexColorMath.np = numpy_module
+        assert result == expected, f"{name} path found {result}, expected {expected}"
+        print(f"{name:<16}{elapsed:>9.3f}s  ({baseline_time / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,87 @@
+"""
+Compares the polyColorPerVertex and MFnMesh.getVertexColors read paths of
+VertexColorIO (including packing the result into VertexColorMath keys) on
+a synthetic 1M-vertex mesh.
+
+By default it runs on the stand-in layer from fake_maya, which only models
+the Python-side conversion of the results. Pass --maya under mayapy to
+measure a real plane mesh, including the command layer.
+
+Usage: python benchmarks/bench_color_read.py [num_vertices]
+       mayapy benchmarks/bench_color_read.py [num_vertices] --maya
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+USE_MAYA = "--maya" in sys.argv
+if USE_MAYA:
+    import maya.standalone
+
+    maya.standalone.initialize(name="python")
+else:
+    import fake_maya
+
+    fake_maya.install()
+
+import VertexColorIO  # noqa: E402
+import VertexColorMath  # noqa: E402
+from bench_color_keys import make_colors  # noqa: E402
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def create_maya_mesh(num_vertices, colors):
+    """Plane with about num_vertices vertices and colors set through the API."""
+    import maya.api.OpenMaya as om
+    from maya import cmds
+
+    side = max(1, int(num_vertices**0.5) - 1)
+    transform = cmds.polyPlane(subdivisionsX=side, subdivisionsY=side, ch=False)[0]
+    shape = cmds.listRelatives(transform, shapes=True, fullPath=True)[0]
+    cmds.polyColorSet(shape, create=True, colorSet="colorSet1")
+    cmds.polyColorSet(shape, currentColorSet=True, colorSet="colorSet1")
+
+    fn = VertexColorIO.get_mesh_fn(shape)
+    count = fn.numVertices
+    fn.setVertexColors(
+        om.MColorArray([om.MColor(colors[i * 3 : i * 3 + 3]) for i in range(count)]),
+        list(range(count)),
+    )
+    return shape, count
+
+
+def run(num_vertices=1000000):
+    colors = make_colors(num_vertices)
+    if USE_MAYA:
+        mesh, num_vertices = create_maya_mesh(num_vertices, colors)
+    else:
+        fake_maya.clear_scene()
+        mesh = "benchShape"
+        fake_maya.create_mesh(mesh, num_vertices).set_colors(colors)
+    print(f"Mesh: {num_vertices} vertices")
+    print(f"{'path':<8}{'read':>10}{'keys':>10}")
+
+    expected = None
+    for name, reader in (
+        ("cmds", VertexColorIO.read_colors_cmds),
+        ("api", VertexColorIO.read_colors_api),
+    ):
+        read_time, colors = timed(reader, mesh)
+        key_time, keys = timed(VertexColorMath.color_keys, colors)
+        if expected is None:
+            expected = keys
+        assert (keys == expected).all(), f"{name} path read different colors"
+        print(f"{name:<8}{read_time:>9.3f}s{key_time:>9.3f}s")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--maya"]
+    run(int(args[0]) if args else 1000000)
@@ -0,0 +1,69 @@
+"""
+Measures pack time and fill ratio of the NumPy lightmap packer against the
+number of shells, on synthetic shell bounding boxes, and the time to place
+lightmaps into shared atlas pages from scratch and around existing ones.
+Runs without Maya.
+
+Usage: python benchmarks/bench_lightmap_packer.py [resolution]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import LightmapPacker  # noqa: E402
+
+SHELL_COUNTS = (10, 50, 100, 500, 1000, 2000)
+
+
+def make_shells(count, seed=0):
+    """Random shell boxes, from slivers to near-square, spread over 0-5 UV."""
+    rng = np.random.default_rng(seed)
+    lower = rng.random((count, 2)) * 5.0
+    extents = rng.random((count, 2)) * rng.random((count, 1)) * 2.0 + 0.01
+    return np.hstack([lower, lower + extents])
+
+
+def run(resolution=1024):
+    print(f"Resolution {resolution}, shell padding 3, tile padding 3")
+    print(f"{'shells':>8}{'rotate':>8}{'time':>10}{'fill':>8}")
+    for count in SHELL_COUNTS:
+        shells = make_shells(count)
+        for allow_rotation in (False, True):
+            start = time.perf_counter()
+            packing = LightmapPacker.pack_shells(
+                shells, resolution, 3.0, 3.0, allow_rotation
+            )
+            elapsed = time.perf_counter() - start
+            fill = packing["fill_ratio"] if packing else 0.0
+            print(f"{count:>8}{str(allow_rotation):>8}{elapsed:>9.3f}s{fill:>8.3f}")
+
+
+def run_atlases(count=400, atlas_size=2048, seed=0):
+    """pack_atlases from scratch vs place_in_free_space around a full scene."""
+    rng = np.random.default_rng(seed)
+    sizes = 2 ** rng.integers(5, 10, count)
+    start = time.perf_counter()
+    pages, positions = LightmapPacker.pack_atlases(sizes, atlas_size)
+    pack_time = time.perf_counter() - start
+
+    occupied = [
+        (page, x, y, size) for page, (x, y), size in zip(pages, positions, sizes)
+    ]
+    start = time.perf_counter()
+    placed = LightmapPacker.place_in_free_space(
+        occupied, 2 ** rng.integers(5, 10, count), atlas_size, add_pages=True
+    )
+    place_time = time.perf_counter() - start
+    print(f"{count} lightmaps into {atlas_size}px atlases")
+    print(f"{'pack_atlases':<22}{pack_time:>9.3f}s{int(pages.max()) + 1:>6} pages")
+    print(f"{'place_in_free_space':<22}{place_time:>9.3f}s{placed[2]:>6} pages")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
+    run_atlases()
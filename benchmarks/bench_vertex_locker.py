@@ -0,0 +1,70 @@
+"""
+Compares the cmds and OpenMaya lock backends of VertexLocker on a synthetic
+100k-vertex mesh, using the stand-in layer from fake_maya. Each backend runs
+on a fresh mesh and on a tweaked one whose 'pnts' array holds every vertex.
+fake_maya only models the Python-side cost of string parsing and plug
+access, so the numbers show scaling, not absolute Maya timings.
+
+Usage: python benchmarks/bench_vertex_locker.py [num_vertices]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_maya
+
+fake_maya.install()
+
+import VertexLocker  # noqa: E402
+
+
+def make_ranges(num_vertices, run_length=500, gap=1500):
+    """Locked regions of run_length vertices every run_length + gap vertices."""
+    return [
+        (start, min(start + run_length - 1, num_vertices - 1))
+        for start in range(0, num_vertices, run_length + gap)
+    ]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run(num_vertices=100000):
+    ranges = make_ranges(num_vertices)
+    locked = VertexLocker.count_range_indices(ranges)
+    print(
+        f"Mesh: {num_vertices} vertices, {len(ranges)} locked ranges "
+        f"({locked} vertices)"
+    )
+    print(f"{'backend':<16}{'lock':>10}{'query':>10}{'unlock':>10}")
+
+    for tweaked in (False, True):
+        for name in ("cmds", "api", None):
+            fake_maya.clear_scene()
+            fake_maya.create_mesh("benchShape", num_vertices, tweaked=tweaked)
+            label = name or "auto"
+            label = f"{label} (tweaked)" if tweaked else label
+
+            lock_time, _ = timed(
+                VertexLocker.set_pnts_lock_ranges, "benchShape", ranges, True, name
+            )
+            query_time, result = timed(
+                VertexLocker.get_locked_vertex_ranges, "benchShape", name
+            )
+            unlock_time, _ = timed(
+                VertexLocker.set_pnts_lock_ranges, "benchShape", result, False, name
+            )
+            assert result == ranges, f"{label} backend returned wrong ranges"
+
+            print(
+                f"{label:<16}{lock_time:>9.3f}s{query_time:>9.3f}s{unlock_time:>9.3f}s"
+            )
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
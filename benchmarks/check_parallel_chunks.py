@@ -0,0 +1,75 @@
+"""
+Checks the scheduling, retry and merge logic of LightmapParallel with
+FakeLayoutWorker, which needs no Maya license: chunks complete in random
+order, some fail and are retried, and the merged UVs must still come back
+in the original shape order. Runs without Maya.
+
+Usage: python benchmarks/check_parallel_chunks.py [num_shapes]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import LightmapParallel  # noqa: E402
+
+
+def make_chunks(num_shapes, chunk_count):
+    items = [
+        {"uuid": f"uuid-{i:05d}", "settings": [3.0, 3.0, 64 + i % 4 * 64]}
+        for i in range(num_shapes)
+    ]
+    return [
+        {"index": index, "shapes": shapes}
+        for index, shapes in enumerate(
+            LightmapParallel.chunk_items(items, chunk_count)
+        )
+    ], items
+
+
+def run(num_shapes=1000, chunk_count=16, workers=4):
+    chunks, items = make_chunks(num_shapes, chunk_count)
+
+    # Chunk 1 fails once (recovers on retry), chunk 3 fails every attempt
+    worker = LightmapParallel.FakeLayoutWorker(fail_attempts={1: 1, 3: 99})
+    start = time.perf_counter()
+    results, errors = LightmapParallel.run_parallel_chunks(
+        chunks, worker, workers=workers, retries=2
+    )
+    elapsed = time.perf_counter() - start
+    merged, failed = LightmapParallel.merge_chunk_results(chunks, results)
+
+    assert results[1] is not None, "chunk 1 should succeed on its retry"
+    assert results[3] is None, "chunk 3 should fail every attempt"
+    assert list(errors) == [3], f"unexpected errors: {errors}"
+    assert worker.calls.count(1) == 2 and worker.calls.count(3) == 3
+
+    expected = [item["uuid"] for item in items]
+    failed_expected = [item["uuid"] for item in chunks[3]["shapes"]]
+    assert failed == failed_expected, "failed uuids out of order"
+    assert [uuid for uuid, _ in merged] == [
+        uuid for uuid in expected if uuid not in set(failed_expected)
+    ], "merged results out of shape order"
+    # The fake UVs encode each shape's position in its chunk, so a result
+    # attached to the wrong shape shows up here
+    positions = {
+        item["uuid"]: (position, item["settings"][2])
+        for chunk in chunks
+        for position, item in enumerate(chunk["shapes"])
+    }
+    for uuid, uv_data in merged:
+        position, resolution = positions[uuid]
+        assert set(uv_data) == set(LightmapParallel.UV_KEYS), uuid
+        assert abs(float(uv_data["u"][0]) - position / resolution) < 1e-6, uuid
+
+    print(
+        f"{num_shapes} shapes in {len(chunks)} chunks on {workers} workers: "
+        f"{len(merged)} merged in order, {len(failed)} failed, "
+        f"{len(worker.calls)} worker calls in {elapsed:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,272 @@
+"""
+Stand-in maya.cmds / maya.api.OpenMaya layer for running the tool
+benchmarks outside of Maya.
+
+Only the calls used by the benchmarked code paths are implemented. Each
+command parses its string arguments like the real command layer does, so
+the relative cost of string-based and plug-based access stays visible.
+"""
+
+import re
+import sys
+import types
+
+PLUG_PATTERN = re.compile(
+    r"^(?P<node>[^.]+)\.pnts\[(?P<start>\d+)(?::(?P<stop>\d+))?\]\.(?P<axis>pnt[xyz])$"
+)
+COMPONENT_PATTERN = re.compile(
+    r"^(?P<node>[^.]+)\.vtx\[(?:(?P<all>\*)|(?P<start>\d+)(?::(?P<stop>\d+))?)\]$"
+)
+AXES = ("pntx", "pnty", "pntz")
+
+
+class FakeMesh:
+    def __init__(self, name, num_vertices):
+        self.name = name
+        self.num_vertices = num_vertices
+        # Locked point axes as a set of (vertex index, axis index)
+        self.locked = set()
+        # Element indices that exist in the 'pnts' array
+        self.pnts_elements = set()
+        # Per-vertex RGBA colors by color set, as flat float lists
+        self.color_sets = {}
+        self.current_color_set = None
+
+    def set_colors(self, rgb, color_set="colorSet1"):
+        """rgb: flat [r, g, b, ...] list with one color per vertex."""
+        rgba = []
+        for i in range(0, len(rgb), 3):
+            rgba.extend(rgb[i : i + 3])
+            rgba.append(1.0)
+        self.color_sets[color_set] = rgba
+        self.current_color_set = self.current_color_set or color_set
+
+
+SCENE = {}
+
+
+def create_mesh(name, num_vertices, tweaked=False):
+    """
+    tweaked: start with every 'pnts' element present, as on a mesh whose
+    vertices have been moved, so API queries walk the full array.
+    """
+    SCENE[name] = FakeMesh(name, num_vertices)
+    if tweaked:
+        SCENE[name].pnts_elements.update(range(num_vertices))
+    return SCENE[name]
+
+
+def clear_scene():
+    SCENE.clear()
+
+
+# --- maya.cmds ---
+
+
+def _set_attr(plug, lock=None, **kwargs):
+    match = PLUG_PATTERN.match(plug)
+    if not match:
+        raise RuntimeError(f"No object matches name: {plug}")
+    mesh = SCENE[match.group("node")]
+    start = int(match.group("start"))
+    stop = int(match.group("stop") or start)
+    axis = AXES.index(match.group("axis"))
+    for index in range(start, stop + 1):
+        mesh.pnts_elements.add(index)
+        if lock:
+            mesh.locked.add((index, axis))
+        else:
+            mesh.locked.discard((index, axis))
+
+
+def _list_attr(plug, multi=False, locked=False, **kwargs):
+    node = plug.partition(".")[0]
+    mesh = SCENE[node]
+    return [f"pnts[{index}].{AXES[axis]}" for index, axis in sorted(mesh.locked)] or None
+
+
+def _poly_evaluate(node, vertex=False, **kwargs):
+    return SCENE[node].num_vertices
+
+
+def _component_range(component):
+    match = COMPONENT_PATTERN.match(component)
+    if not match:
+        raise RuntimeError(f"No object matches name: {component}")
+    mesh = SCENE[match.group("node")]
+    if match.group("all"):
+        return mesh, 0, mesh.num_vertices - 1
+    start = int(match.group("start"))
+    return mesh, start, int(match.group("stop") or start)
+
+
+def _poly_color_per_vertex(components, query=False, rgb=None, **kwargs):
+    if isinstance(components, str):
+        components = [components]
+    result = []
+    for component in components:
+        mesh, start, stop = _component_range(component)
+        rgba = mesh.color_sets[mesh.current_color_set]
+        for index in range(start, stop + 1):
+            if query:
+                result.extend(rgba[index * 4 : index * 4 + 3])
+            else:
+                rgba[index * 4 : index * 4 + 3] = list(rgb)
+    return result if query else None
+
+
+def _poly_color_set(node, query=False, allColorSets=False, colorSet=None, **kwargs):
+    mesh = SCENE[node]
+    if not query:
+        mesh.current_color_set = colorSet
+        return None
+    if allColorSets:
+        return list(mesh.color_sets) or None
+    return [mesh.current_color_set] if mesh.current_color_set else None
+
+
+def _node_type(node):
+    return "mesh" if node in SCENE else "transform"
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+# --- maya.api.OpenMaya ---
+
+
+class MSelectionList:
+    def __init__(self):
+        self._items = []
+
+    def add(self, name):
+        if name not in SCENE:
+            raise RuntimeError(f"No object matches name: {name}")
+        self._items.append(SCENE[name])
+
+    def getDependNode(self, index):
+        return self._items[index]
+
+    def getDagPath(self, index):
+        return self._items[index]
+
+
+class MColor(tuple):
+    pass
+
+
+class MColorArray:
+    """Flat float storage; MColor objects are created on access like the API."""
+
+    def __init__(self, flat=None):
+        self._flat = list(flat or [])
+
+    def __len__(self):
+        return len(self._flat) // 4
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return MColor(self._flat[index * 4 : index * 4 + 4])
+
+    def __iter__(self):
+        channels = iter(self._flat)
+        return map(MColor, zip(channels, channels, channels, channels))
+
+
+class MFnMesh:
+    def __init__(self, mesh):
+        self._mesh = mesh
+
+    def numVertices(self):
+        return self._mesh.num_vertices
+
+    def currentColorSetName(self):
+        return self._mesh.current_color_set
+
+    def getVertexColors(self, color_set=None):
+        rgba = self._mesh.color_sets[color_set or self._mesh.current_color_set]
+        return MColorArray(rgba)
+
+
+class MPlug:
+    def __init__(self, mesh, index=None, axis=None):
+        self._mesh = mesh
+        self._index = index
+        self._axis = axis
+
+    # Array plug
+    def numElements(self):
+        self._physical = sorted(self._mesh.pnts_elements)
+        return len(self._physical)
+
+    def elementByPhysicalIndex(self, physical_index):
+        return MPlug(self._mesh, self._physical[physical_index])
+
+    def elementByLogicalIndex(self, index):
+        self._mesh.pnts_elements.add(index)
+        return MPlug(self._mesh, index)
+
+    # Element plug
+    def logicalIndex(self):
+        return self._index
+
+    def child(self, axis):
+        return MPlug(self._mesh, self._index, axis)
+
+    # Child plug
+    @property
+    def isLocked(self):
+        return (self._index, self._axis) in self._mesh.locked
+
+    @isLocked.setter
+    def isLocked(self, value):
+        if value:
+            self._mesh.locked.add((self._index, self._axis))
+        else:
+            self._mesh.locked.discard((self._index, self._axis))
+
+
+class MFnDependencyNode:
+    def __init__(self, node):
+        self._node = node
+
+    def findPlug(self, name, want_networked):
+        return MPlug(self._node)
+
+
+def install():
+    """
+    Registers the stand-in modules as 'maya', 'maya.cmds' and
+    'maya.api.OpenMaya' so the tool scripts can be imported.
+    """
+    maya = types.ModuleType("maya")
+    cmds = types.ModuleType("maya.cmds")
+    api = types.ModuleType("maya.api")
+    om = types.ModuleType("maya.api.OpenMaya")
+
+    cmds.setAttr = _set_attr
+    cmds.listAttr = _list_attr
+    cmds.polyEvaluate = _poly_evaluate
+    cmds.nodeType = _node_type
+    cmds.polyColorPerVertex = _poly_color_per_vertex
+    cmds.polyColorSet = _poly_color_set
+    cmds.undoInfo = _noop
+    cmds.warning = _noop
+
+    om.MSelectionList = MSelectionList
+    om.MFnDependencyNode = MFnDependencyNode
+    om.MPlug = MPlug
+    om.MColor = MColor
+    om.MColorArray = MColorArray
+    om.MFnMesh = MFnMesh
+
+    maya.cmds = cmds
+    maya.api = api
+    api.OpenMaya = om
+    sys.modules.update(
+        {"maya": maya, "maya.cmds": cmds, "maya.api": api, "maya.api.OpenMaya": om}
+    )